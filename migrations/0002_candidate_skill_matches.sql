@@ -0,0 +1,25 @@
+-- Precomputed best match per (candidate, catalog skill).
+-- Maintained incrementally by the Repository on ingest and catalog upserts;
+-- rows disappear with their candidate or skill through ON DELETE CASCADE.
+CREATE TABLE IF NOT EXISTS candidate_skill_matches (
+candidate_id BIGINT NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+skill_id BIGINT NOT NULL REFERENCES skill_vectors(id) ON DELETE CASCADE,
+best_distance DOUBLE PRECISION NOT NULL,
+updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+PRIMARY KEY (candidate_id, skill_id)
+);
+
+
+CREATE INDEX IF NOT EXISTS candidate_skill_matches_skill_idx
+ON candidate_skill_matches(skill_id, best_distance);
+
+
+-- Backfill from existing data (only matches under the default 0.65 threshold are kept)
+INSERT INTO candidate_skill_matches (candidate_id, skill_id, best_distance)
+SELECT s.candidate_id, sk.id, MIN(sv.embedding <=> sk.embedding)
+FROM section_vectors sv
+JOIN sections s ON s.id = sv.section_id
+CROSS JOIN skill_vectors sk
+GROUP BY s.candidate_id, sk.id
+HAVING MIN(sv.embedding <=> sk.embedding) < 0.65
+ON CONFLICT (candidate_id, skill_id) DO NOTHING;
@@ -0,0 +1,19 @@
+-- Every query ranks with the cosine operator (<=>), which the vector_l2_ops
+-- indexes from 0001 can never serve. Replace them with cosine indexes.
+DROP INDEX IF EXISTS section_vectors_embed_idx;
+DROP INDEX IF EXISTS skill_vectors_embed_idx;
+
+
+-- HNSW is the default: good recall without training data and no rebuild as rows grow.
+-- Query-time knob: hnsw.ef_search (Settings.hnsw_ef_search / per-request ef_search).
+-- For >1M sections raise maintenance_work_mem before building so the graph fits in memory.
+CREATE INDEX IF NOT EXISTS section_vectors_embed_hnsw_idx
+ON section_vectors USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS skill_vectors_embed_hnsw_idx
+ON skill_vectors USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+
+-- IVFFlat alternative (faster build, smaller, needs data before building):
+-- use Repository.rebuild_vector_indexes("ivfflat") or scripts/check_ann_recall.py --rebuild ivfflat,
+-- which sizes lists from the row count. Query-time knob: ivfflat.probes.
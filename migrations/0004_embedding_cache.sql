@@ -0,0 +1,10 @@
+-- Persistent embedding cache, keyed by (model, task_type, sha256 of normalized text).
+-- Unconstrained VECTOR so entries for models of any dimension can share the table.
+CREATE TABLE IF NOT EXISTS embedding_cache (
+model TEXT NOT NULL,
+task_type TEXT NOT NULL,
+text_hash TEXT NOT NULL,
+embedding VECTOR NOT NULL,
+created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+PRIMARY KEY (model, task_type, text_hash)
+);
@@ -0,0 +1,19 @@
+-- Ingest job queue. Workers claim rows with FOR UPDATE SKIP LOCKED,
+-- so any number of worker threads/processes can share it without extra services.
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+id BIGSERIAL PRIMARY KEY,
+status TEXT NOT NULL DEFAULT 'queued',  -- queued | running | done | failed
+filename TEXT,
+content BYTEA,                          -- cleared once the job finishes
+candidate_id BIGINT REFERENCES candidates(id) ON DELETE SET NULL,
+result JSONB,
+error TEXT,
+attempts INTEGER NOT NULL DEFAULT 0,
+created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+started_at TIMESTAMPTZ,
+finished_at TIMESTAMPTZ
+);
+
+
+CREATE INDEX IF NOT EXISTS ingest_jobs_queued_idx ON ingest_jobs(id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS ingest_jobs_running_idx ON ingest_jobs(started_at) WHERE status = 'running';
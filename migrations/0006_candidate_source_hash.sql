@@ -0,0 +1,4 @@
+-- sha256 of the uploaded file bytes, so bulk ingest can skip files it already processed
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS source_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS candidates_source_hash_idx ON candidates(source_hash);
@@ -0,0 +1,25 @@
+-- sha256 of the normalized extracted CV text (lower-cased, whitespace collapsed).
+-- Unique, so the same CV is only extracted/embedded/stored once.
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+
+-- Backfill existing rows; for pre-existing duplicates only the oldest candidate gets the hash
+UPDATE candidates c
+SET content_hash = h.content_hash
+FROM (
+    SELECT DISTINCT ON (content_hash) id, content_hash
+    FROM (
+        SELECT id,
+               encode(sha256(convert_to(lower(btrim(regexp_replace(raw_text, '\s+', ' ', 'g'))), 'UTF8')), 'hex') AS content_hash
+        FROM candidates
+        WHERE content_hash IS NULL AND raw_text IS NOT NULL
+    ) hashed
+    ORDER BY content_hash, id
+) h
+WHERE c.id = h.id;
+
+
+CREATE UNIQUE INDEX IF NOT EXISTS candidates_content_hash_key ON candidates(content_hash);
+
+
+ALTER TABLE ingest_jobs ADD COLUMN IF NOT EXISTS force BOOLEAN NOT NULL DEFAULT false;
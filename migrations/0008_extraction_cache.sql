@@ -0,0 +1,15 @@
+-- LLM extraction results keyed by sha256(model, prompt fingerprint, CV text).
+-- Entries expire after EXTRACTION_CACHE_TTL_DAYS and the least recently used
+-- are evicted beyond EXTRACTION_CACHE_MAX_ENTRIES.
+CREATE TABLE IF NOT EXISTS extraction_cache (
+cache_key TEXT PRIMARY KEY,
+model TEXT NOT NULL,
+prompt_version TEXT NOT NULL,
+result JSONB NOT NULL,
+created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+last_used_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+
+CREATE INDEX IF NOT EXISTS extraction_cache_created_idx ON extraction_cache(created_at);
+CREATE INDEX IF NOT EXISTS extraction_cache_last_used_idx ON extraction_cache(last_used_at);
@@ -0,0 +1,3 @@
+-- Uploads are spooled to disk; jobs point at the file instead of carrying the bytes.
+-- content stays for jobs created from in-memory sources (e.g. ZIP members).
+ALTER TABLE ingest_jobs ADD COLUMN IF NOT EXISTS source_path TEXT;
@@ -0,0 +1,21 @@
+-- Lexical arm of hybrid search: exact recruiter terms ("Kubernetes CKA", "SAP FICO")
+-- that embeddings blur. Generated columns stay in sync with every insert/update;
+-- queries must use the same 'english' configuration to hit the GIN indexes.
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(topic, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(text_for_embedding, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS sections_search_tsv_gin ON sections USING GIN (search_tsv);
+
+
+-- Candidate headline: the name plus the top of the CV (title, summary, contact line).
+-- The full raw_text is left out so long CVs don't drown the section-level ranking.
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(full_name, '')), 'A') ||
+    setweight(to_tsvector('english', left(coalesce(raw_text, ''), 1000)), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS candidates_search_tsv_gin ON candidates USING GIN (search_tsv);
@@ -0,0 +1,25 @@
+-- Typed copies of the filterable CV fields that otherwise live only in sections.payload,
+-- written at ingest (see services/facets.py). Existing rows: scripts/backfill_candidate_facets.py
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS industry TEXT;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS target_role TEXT;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS role_confidence REAL;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS country TEXT;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS currently_working BOOLEAN;
+
+CREATE INDEX IF NOT EXISTS candidates_industry_idx ON candidates(industry);
+CREATE INDEX IF NOT EXISTS candidates_target_role_idx ON candidates(target_role);
+CREATE INDEX IF NOT EXISTS candidates_country_idx ON candidates(country);
+CREATE INDEX IF NOT EXISTS candidates_currently_working_idx ON candidates(currently_working);
+
+
+-- One row per distinct (case-insensitive) skill a CV lists, with its 1-10 system_rating
+CREATE TABLE IF NOT EXISTS candidate_skills (
+candidate_id BIGINT NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+skill TEXT NOT NULL,
+rating SMALLINT CHECK (rating BETWEEN 1 AND 10)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS candidate_skills_key ON candidate_skills(candidate_id, lower(skill));
+-- "Python rated 7+" and "any skill rated 8+", both as index range scans
+CREATE INDEX IF NOT EXISTS candidate_skills_skill_rating_idx ON candidate_skills(lower(skill), rating, candidate_id);
+CREATE INDEX IF NOT EXISTS candidate_skills_rating_idx ON candidate_skills(rating, candidate_id);
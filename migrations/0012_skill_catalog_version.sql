@@ -0,0 +1,3 @@
+-- Catalog version for in-memory copies of skill_vectors (services/catalog_index.py):
+-- (count(*), max(updated_at)) changes on every insert, update and delete
+ALTER TABLE skill_vectors ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
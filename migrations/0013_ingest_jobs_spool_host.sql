@@ -0,0 +1,3 @@
+-- Jobs whose source_path is on a host-local spool (UPLOAD_SPOOL_DIR unset) record that host;
+-- only workers running there claim them. NULL = any worker (bytes in content, or a shared spool).
+ALTER TABLE ingest_jobs ADD COLUMN IF NOT EXISTS spool_host TEXT;
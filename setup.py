@@ -11,6 +11,7 @@ setup(
     install_requires=[
         "python-dotenv",
         "psycopg[binary]",
+        "psycopg-pool",
         "pydantic",
         "pypdf",
         "fastapi",
@@ -18,9 +19,13 @@ setup(
         "google-generativeai",
         "python-multipart",
         "pandas",
+        "numpy",
         "openpyxl",
         "setuptools>=42",
         "wheel",
-        "pgvector"  # for vector operations with PostgreSQL
+        "pgvector>=0.3"  # for vector operations with PostgreSQL (0.3 adds halfvec support)
     ],
+    entry_points={
+        "console_scripts": ["cvstack=cvstack.cli.app:main"],
+    },
 )
\ No newline at end of file
@@ -1,30 +1,60 @@
 from __future__ import annotations
-import io
+import hashlib
 import json
 import logging
+import os
+import shutil
+import tempfile
 import traceback
+import zipfile
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Literal, Optional
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from pypdf import PdfReader
+from pydantic import BaseModel, Field
 
 # --- Imports from your project ---
-from ..cli.app import build_sections
-from ..db.repository import Repository
-from ..services.embedder import Embedder
-from ..services.extractor import CVExtractor
+from ..config import settings
+from ..db.repository import (
+    HNSW_MAX_EF_SEARCH, Repository, check_vector_schema, close_pool, open_pool, pool_stats, pooled_repository,
+)
+from ..schemas.search import SearchFilters
+from ..services.embedding_cache import get_embedding_cache
+from ..services.extraction_cache import get_extraction_cache
 from ..services.candidate_search import SearchService
+from ..services.catalog_index import get_catalog_index
+from ..services.search_cache import get_facet_cache, get_ranking_cache
+from ..services.bulk_ingest import BATCH_SIZE as BULK_BATCH_SIZE, iter_sources
+from ..services.ingest import IngestPipeline
+from ..services.ingest_queue import SPOOL_HOST, IngestWorkerPool
+from ..services.pdf_text import shutdown_pdf_executor
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --- App Setup ---
-app = FastAPI(title="CVStack API", version="0.1.0")
+ingest_workers = IngestWorkerPool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One connection pool for the whole process, handed out per request
+    open_pool()
+    check_vector_schema()
+    get_catalog_index().load()
+    ingest_workers.start()
+    try:
+        yield
+    finally:
+        ingest_workers.stop()
+        shutdown_pdf_executor()
+        close_pool()
+
+app = FastAPI(title="CVStack API", version="0.1.0", lifespan=lifespan)
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
@@ -42,18 +72,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_PAGE_SIZE = 1000  # largest `limit` a search endpoint accepts
+
 # --- Pydantic Models ---
 class SearchRequest(BaseModel):
     query: str
-    limit: int = 50
+    limit: int = Field(50, ge=1, le=MAX_PAGE_SIZE)
+    # ANN tuning (None = server defaults): higher = better recall, slower
+    ef_search: Optional[int] = Field(None, ge=1, le=HNSW_MAX_EF_SEARCH)
+    probes: Optional[int] = Field(None, ge=1)
+    # vector = embedding ANN | lexical = full-text only | hybrid = both, fused by reciprocal rank
+    mode: Literal["vector", "lexical", "hybrid"] = "vector"
+    # Applied inside the search queries, so limit counts matching candidates
+    filters: Optional[SearchFilters] = None
+    # next_cursor from the previous page; limit is then the page size
+    cursor: Optional[str] = None
 
-# --- Helper Functions ---
-def sanitize_text(text: str) -> str:
-    if not text:
-        return ""
-    cleaned = text.replace("\x00", "")
-    cleaned = "".join(char if ord(char) >= 32 else " " for char in cleaned)
-    return cleaned.strip()
+# --- Dependencies ---
+def get_repository() -> Iterator[Repository]:
+    """Borrow a pooled connection for the duration of one request."""
+    with pooled_repository() as repo:
+        yield repo
 
 # ===========================
 #        ENDPOINTS
@@ -63,28 +103,79 @@ def sanitize_text(text: str) -> str:
 def health() -> Dict[str, str]:
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics() -> Dict[str, Any]:
+    return {
+        "db_pool": pool_stats(),
+        "embedding_cache": get_embedding_cache().snapshot(),
+        "extraction_cache": get_extraction_cache().snapshot(),
+        "catalog_index": get_catalog_index().snapshot(),
+        "facet_cache": get_facet_cache().snapshot(),
+        "ranking_cache": get_ranking_cache().snapshot(),
+    }
+
 # 1. TEXT SEARCH
 @app.post("/search")
-def search_candidates(request: SearchRequest) -> Dict[str, Any]:
+def search_candidates(request: SearchRequest, repo: Repository = Depends(get_repository)) -> Dict[str, Any]:
     try:
-        service = SearchService()
-        results = service.search(request.query, request.limit)
-        return {"count": len(results), "results": results}
+        service = SearchService(repo=repo)
+        response = service.search_page(
+            request.query,
+            mode=request.mode,
+            limit=request.limit,
+            cursor=request.cursor,
+            ef_search=request.ef_search,
+            probes=request.probes,
+            filters=request.filters,
+        )
+        return {"count": len(response["results"]), **response}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"[SEARCH ERROR] {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class FacetRequest(BaseModel):
+    # Text query (mode as for /search) or one catalog skill; neither = facets over all candidates
+    query: Optional[str] = None
+    skill: Optional[str] = None
+    mode: Literal["vector", "lexical", "hybrid"] = "vector"
+    limit: int = Field(50, ge=1, le=MAX_PAGE_SIZE)
+    ef_search: Optional[int] = Field(None, ge=1, le=HNSW_MAX_EF_SEARCH)
+    probes: Optional[int] = Field(None, ge=1)
+    filters: Optional[SearchFilters] = None
+
+@app.post("/search/facets")
+def search_facets(request: FacetRequest, repo: Repository = Depends(get_repository)) -> Dict[str, Any]:
+    try:
+        service = SearchService(repo=repo)
+        return service.search_facets(
+            query=request.query,
+            skill=request.skill,
+            mode=request.mode,
+            top_k=request.limit,
+            ef_search=request.ef_search,
+            probes=request.probes,
+            filters=request.filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"[FACETS ERROR] {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # 2. UPLOAD SKILL CATALOG (Fixes your 404 error)
 @app.post("/skills/catalog")
-async def upload_skill_catalog(file: UploadFile = File(...)):
+def upload_skill_catalog(file: UploadFile = File(...), repo: Repository = Depends(get_repository)):
+    # Plain def: embedding and the match refresh block, so this runs in the threadpool
     try:
-        content = await file.read()
+        content = file.file.read()
         skills_data = json.loads(content)
         
         if not isinstance(skills_data, list):
             raise ValueError("File must be a JSON array")
 
-        service = SearchService()
+        service = SearchService(repo=repo)
         service.index_catalog(skills_data)
         
         return {
@@ -98,8 +189,7 @@ async def upload_skill_catalog(file: UploadFile = File(...)):
 
 # 3. LIST SKILLS (For the blue tags)
 @app.get("/skills/catalog/list")
-def list_skills():
-    repo = Repository()
+def list_skills(repo: Repository = Depends(get_repository)):
     try:
         with repo.conn.cursor() as cur:
             cur.execute("SELECT skill_name FROM skill_vectors ORDER BY skill_name ASC")
@@ -108,38 +198,44 @@ def list_skills():
     except Exception as e:
         logger.error(f"List skills failed: {e}")
         return []
-    finally:
-        repo.close()
 
 # 4. SEARCH BY CATALOG (For "Find Matching CVs" button)
 # This endpoint handles the "Find Matching CVs" button
 @app.post("/search/catalog")
-def search_by_catalog_stored(limit: int = 50) -> Dict[str, Any]:
+def search_by_catalog_stored(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    repo: Repository = Depends(get_repository),
+) -> Dict[str, Any]:
     try:
-        service = SearchService()
+        service = SearchService(repo=repo)
         
-        # This calls the method we just updated in Step 1
-        results = service.search_by_catalog(limit=limit)
+        # Ranked once and cached; pass next_cursor back for the following page
+        page = service.search_by_catalog_page(limit=limit, cursor=cursor)
         
         return {
             "status": "success", 
-            "candidates_found": len(results),
-            "results": results
+            "candidates_found": len(page["results"]),
+            "results": page["results"],
+            "next_cursor": page["next_cursor"],
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Catalog search failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     
 class SingleSkillRequest(BaseModel):
     skill: str
-    limit: int = 50
+    limit: int = Field(50, ge=1, le=MAX_PAGE_SIZE)
+    filters: Optional[SearchFilters] = None
 
 @app.post("/search/catalog/skill")
-def search_by_single_skill_endpoint(request: SingleSkillRequest) -> Dict[str, Any]:
+def search_by_single_skill_endpoint(request: SingleSkillRequest, repo: Repository = Depends(get_repository)) -> Dict[str, Any]:
     try:
-        service = SearchService()
+        service = SearchService(repo=repo)
         # This calls the method to match ONE specific skill
-        results = service.search_by_catalog_skill(request.skill, request.limit)
+        results = service.search_by_catalog_skill(request.skill, request.limit, filters=request.filters)
         return {
             "status": "success", 
             "candidates_found": len(results),
@@ -150,61 +246,113 @@ def search_by_single_skill_endpoint(request: SingleSkillRequest) -> Dict[str, An
         raise HTTPException(status_code=500, detail=str(e))
     
 # 5. INGEST CV (PDF Upload)
-@app.post("/ingest")
-async def ingest(file: UploadFile = File(...)) -> Dict[str, Any]:
+# Uploads are queued; the worker pool runs parsing, extraction, embedding and the DB save.
+@app.post("/ingest", status_code=202)
+async def ingest(file: UploadFile = File(...), force: bool = False) -> Dict[str, Any]:
+    """Queue a CV. Re-uploads of an already ingested file return its candidate unless force=true."""
+    path: Optional[str] = None
     try:
-        logger.info("[INGEST] filename=%s", file.filename)
-        content = await file.read()
-        
-        # PDF Parsing
-        if file.filename and file.filename.lower().endswith(".pdf"):
-            try:
-                reader = PdfReader(io.BytesIO(content))
-                text = "\n".join([sanitize_text(p.extract_text() or "") for p in reader.pages])
-            except Exception as e:
-                raise ValueError(f"PDF parse failed: {e}")
-        else:
-            text = sanitize_text(content.decode("utf-8", errors="ignore"))
-
-        if not text:
-            raise ValueError("No text extracted")
-
-        # Extraction
-        extractor = CVExtractor()
-        parsed = extractor.extract(text)
-        
-        # Explicitly save to Excel (backup in case internal save fails)
-        try:
-            excel_path = extractor.save_to_csv(parsed)
-            logger.info(f"[INGEST] Excel saved to: {excel_path}")
-        except Exception as excel_err:
-            logger.warning(f"[INGEST] Failed to save Excel: {excel_err}")
-        
-        # Sanitization
-        profile = parsed.get("user_profile") or {}
-        # ... (Simplified sanitization for brevity, your original logic fits here) ...
-        
-        # Database Save
-        repo = Repository()
-        try:
-            full_name = f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip() or None
-            candidate_id = repo.insert_candidate(full_name, profile.get("email"), text)
-            
-            section_rows, texts = build_sections(parsed, candidate_id)
-            texts = [sanitize_text(t) for t in texts]
-            
-            emb = Embedder()
-            vectors = emb.embed(texts) if texts else []
-            
-            if section_rows:
-                s_ids = repo.insert_sections(section_rows)
-                if s_ids and vectors:
-                    repo.insert_vectors(s_ids, vectors)
-        finally:
-            repo.close()
-
-        return {"candidate_id": candidate_id, "parsed": parsed}
+        logger.info("[INGEST] filename=%s force=%s", file.filename, force)
+
+        # Spool the upload to disk in chunks instead of buffering it in memory
+        os.makedirs(settings.upload_spool_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=settings.upload_spool_dir, suffix=Path(file.filename or "").suffix)
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.upload_max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.upload_max_bytes} bytes")
+                digest.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        source_hash = digest.hexdigest()
 
+        def enqueue() -> Dict[str, Any]:
+            # A shared spool is readable by every worker. Otherwise the file is only visible on
+            # this host: our own workers read it in place (the job is pinned to this host), and
+            # only when this process runs none does the job carry the bytes instead
+            content = source_path = spool_host = None
+            if settings.upload_spool_shared:
+                source_path = path
+            elif ingest_workers.workers > 0:
+                source_path, spool_host = path, SPOOL_HOST
+            else:
+                with open(path, "rb") as f:
+                    content = f.read()
+            with pooled_repository() as repo:
+                if not force:
+                    existing = repo.find_candidates_by_source_hash([source_hash])
+                    if source_hash in existing:
+                        candidate_id = existing[source_hash]
+                        return {
+                            "job_id": None,
+                            "status": "done",
+                            "candidate_id": candidate_id,
+                            "result": {"candidate_id": candidate_id, "duplicate": True},
+                        }
+                job_id = repo.enqueue_ingest_job(
+                    file.filename, content, force=force, source_path=source_path, spool_host=spool_host
+                )
+                return {"job_id": job_id, "status": "queued", "spooled": source_path is not None}
+
+        response = await run_in_threadpool(enqueue)
+        if response.pop("spooled", False):
+            path = None  # the worker owns the spooled file now
+        if response["job_id"] is not None:
+            ingest_workers.notify()
+        return response
+
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if path is not None:
+            os.remove(path)
+
+# Bulk ingest: a ZIP of PDFs/text files becomes one queued job per new file
+@app.post("/ingest/bulk", status_code=202)
+def ingest_bulk(file: UploadFile = File(...), repo: Repository = Depends(get_repository)) -> Dict[str, Any]:
+    if not zipfile.is_zipfile(file.file):
+        raise HTTPException(status_code=400, detail="Upload must be a ZIP archive of PDF/text CVs")
+    file.file.seek(0)
+
+    with tempfile.NamedTemporaryFile(suffix=".zip") as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        tmp.flush()
+
+        job_ids: List[int] = []
+        skipped: List[str] = []
+        batch: List[Any] = []
+
+        def flush_batch() -> None:
+            existing = repo.find_candidates_by_source_hash([h for _, _, h in batch])
+            for name, content, source_hash in batch:
+                if source_hash in existing:
+                    skipped.append(name)
+                else:
+                    job_ids.append(repo.enqueue_ingest_job(name, content))
+            batch.clear()
+
+        for name, load in iter_sources(Path(tmp.name)):
+            content = load()
+            batch.append((name, content, IngestPipeline.source_hash(content)))
+            if len(batch) >= BULK_BATCH_SIZE:
+                flush_batch()
+        if batch:
+            flush_batch()
+
+    ingest_workers.notify()
+    logger.info(f"[INGEST] bulk upload {file.filename}: {len(job_ids)} queued, {len(skipped)} already ingested")
+    return {"queued": len(job_ids), "job_ids": job_ids, "skipped": skipped}
+
+@app.get("/ingest/{job_id}")
+def ingest_status(job_id: int, repo: Repository = Depends(get_repository)) -> Dict[str, Any]:
+    job = repo.get_ingest_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingest job {job_id} not found")
+    return job
@@ -1,46 +1,22 @@
 from __future__ import annotations
+import argparse
 import json
 import logging
-from typing import Any, Dict, List, Tuple
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..db.repository import Repository
+from ..sanitize import sanitize_dict
 
 
 log = logging.getLogger(__name__)
 
 
-def sanitize_text(text: str) -> str:
-    """Remove null bytes and other problematic characters from text"""
-    if not text:
-        return ""
-    cleaned = text.replace("\x00", "")
-    cleaned = "".join(char if ord(char) >= 32 else " " for char in cleaned)
-    return cleaned.strip()
-
-
-def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Recursively sanitize all text in a dictionary"""
-    result = {}
-    for key, value in data.items():
-        if isinstance(value, str):
-            result[key] = sanitize_text(value)
-        elif isinstance(value, dict):
-            result[key] = sanitize_dict(value)
-        elif isinstance(value, list):
-            result[key] = [
-                sanitize_dict(item) if isinstance(item, dict)
-                else sanitize_text(item) if isinstance(item, str)
-                else item
-                for item in value
-            ]
-        else:
-            result[key] = value
-    return result
-
-
-def build_sections(parsed: Dict[str, Any], candidate_id: int) -> Tuple[List[Tuple[int, str, Dict[str, Any], str]], List[str]]:
+def build_sections(parsed: Dict[str, Any], candidate_id: Optional[int] = None) -> Tuple[List[Tuple[int, str, Dict[str, Any], str]], List[str]]:
     """
     Convert parsed CV data into database rows for the sections table.
+    candidate_id may be None when the candidate is written in the same transaction
+    (Repository.save_parsed_cv fills it in).
     Returns:
         - section_rows: List of tuples (candidate_id, topic, payload, text_for_embedding)
         - texts: List of text strings for embedding
@@ -103,3 +79,35 @@ def build_sections(parsed: Dict[str, Any], candidate_id: int) -> Tuple[List[Tupl
 
     return rows, texts
 
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: `cvstack ingest-bulk <dir-or-zip>`."""
+    parser = argparse.ArgumentParser(prog="cvstack", description="CVStack command line tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bulk = sub.add_parser("ingest-bulk", help="Ingest every PDF/text CV in a directory or ZIP archive")
+    bulk.add_argument("path", type=Path)
+    bulk.add_argument("--threads", type=int, default=None, help="LLM/embedding worker threads")
+
+    args = parser.parse_args(argv)
+
+    # Imported here: the services import build_sections from this module
+    from ..db.repository import check_vector_schema, close_pool, open_pool
+    from ..logging_conf import configure_logging
+    from ..services.bulk_ingest import BulkIngest
+    from ..services.pdf_text import shutdown_pdf_executor
+
+    configure_logging()
+    if args.command == "ingest-bulk":
+        open_pool()
+        try:
+            check_vector_schema()
+            stats = BulkIngest(threads=args.threads).run(args.path)
+        finally:
+            shutdown_pdf_executor()
+            close_pool()
+        print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import os
+import tempfile
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -13,13 +14,73 @@ class Settings:
     pg_db: str = os.getenv("PGDATABASE", "cvdb")
     pg_user: str = os.getenv("PGUSER", "postgres")
     pg_password: str = os.getenv("PGPASSWORD", "postgres")
+    pg_pool_min_size: int = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+    pg_pool_max_size: int = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+    pg_pool_timeout: float = float(os.getenv("PG_POOL_TIMEOUT", "30"))
+    pg_pool_max_idle: float = float(os.getenv("PG_POOL_MAX_IDLE", "600"))
+    pg_pool_max_lifetime: float = float(os.getenv("PG_POOL_MAX_LIFETIME", "3600"))
 
     # AI
     gemini_api_key: str | None = os.getenv("GEMINI_API_KEY")
     extraction_model: str = os.getenv("EXTRACTION_MODEL", "models/gemini-2.5-flash")
+    extraction_mode: str = os.getenv("EXTRACTION_MODE", "two_step")  # two_step | combined (single LLM call)
+    cv_preprocess: bool = os.getenv("CV_PREPROCESS", "1") == "1"  # strip headers/boilerplate, section-targeted prompts
+    extraction_cache_enabled: bool = os.getenv("EXTRACTION_CACHE", "1") == "1"
+    extraction_cache_ttl_days: int = int(os.getenv("EXTRACTION_CACHE_TTL_DAYS", "90"))
+    extraction_cache_max_entries: int = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "100000"))
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "models/text-embedding-004")
     embedding_dim: int = int(os.getenv("EMBEDDING_DIM", "768"))
     skip_embedding: bool = os.getenv("SKIP_EMBEDDING", "0") == "1"
+    embedding_cache_size: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "20000"))  # in-memory LRU entries
+    embedding_cache_db: bool = os.getenv("EMBEDDING_CACHE_DB", "1") == "1"  # Postgres-backed second tier
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))  # provider per-request limit
+    embedding_concurrency: int = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+    embedding_max_retries: int = int(os.getenv("EMBEDDING_MAX_RETRIES", "4"))
+    embedding_retry_backoff: float = float(os.getenv("EMBEDDING_RETRY_BACKOFF", "1.0"))  # seconds, doubled per attempt
+
+    # Search
+    skill_match_threshold: float = float(os.getenv("SKILL_MATCH_THRESHOLD", "0.65"))  # max cosine distance for a catalog match
+    vector_index_method: str = os.getenv("VECTOR_INDEX_METHOD", "hnsw")  # hnsw | ivfflat
+    hnsw_ef_search: int = int(os.getenv("HNSW_EF_SEARCH", "40"))
+    ivfflat_probes: int = int(os.getenv("IVFFLAT_PROBES", "10"))
+    # vector = float32 columns | halfvec = float16 columns (about half the heap and index)
+    # | binary = float32 heap, bit-quantized index + float32 re-rank. Switch with scripts/migrate_vector_storage.py
+    vector_storage: str = os.getenv("VECTOR_STORAGE", "vector")
+    vector_rerank_candidates: int = int(os.getenv("VECTOR_RERANK_CANDIDATES", "100"))  # binary mode; 0 = no re-rank
+    search_section_overfetch: int = int(os.getenv("SEARCH_SECTION_OVERFETCH", "4"))  # nearest sections fetched per requested candidate
+    search_snippet_chars: int = int(os.getenv("SEARCH_SNIPPET_CHARS", "300"))
+    # Filtered searches: relaxed_order | strict_order (hnsw only) | none (pgvector < 0.8, no iterative scans)
+    vector_iterative_scan: str = os.getenv("VECTOR_ITERATIVE_SCAN", "relaxed_order")
+    hybrid_arm_limit: int = int(os.getenv("HYBRID_ARM_LIMIT", "100"))  # candidates fetched per arm before fusion
+    hybrid_rrf_k: int = int(os.getenv("HYBRID_RRF_K", "60"))  # reciprocal-rank fusion constant: 1 / (k + rank)
+    facet_candidates: int = int(os.getenv("FACET_CANDIDATES", "1000"))  # matched candidates the facet counts cover
+    facet_top_skills: int = int(os.getenv("FACET_TOP_SKILLS", "25"))
+    facet_cache_ttl: float = float(os.getenv("FACET_CACHE_TTL", "60"))  # seconds; 0 = no caching
+    facet_cache_size: int = int(os.getenv("FACET_CACHE_SIZE", "256"))
+    # Pagination: ranked lists are computed once per query, cached, and paged with a (score, candidate_id) cursor
+    search_ranked_depth: int = int(os.getenv("SEARCH_RANKED_DEPTH", "200"))  # /search results reachable by paging
+    catalog_ranked_depth: int = int(os.getenv("CATALOG_RANKED_DEPTH", "1000"))  # cached; deeper pages use a SQL keyset
+    ranking_cache_ttl: float = float(os.getenv("RANKING_CACHE_TTL", "120"))  # seconds; 0 = no caching
+    ranking_cache_size: int = int(os.getenv("RANKING_CACHE_SIZE", "128"))
+    catalog_match_batch: int = int(os.getenv("CATALOG_MATCH_BATCH", "20000"))  # section vectors scored per matrix multiply
+
+    # Ingest queue
+    ingest_workers: int = int(os.getenv("INGEST_WORKERS", "2"))  # worker threads started with the API (0 = none)
+    ingest_poll_interval: float = float(os.getenv("INGEST_POLL_INTERVAL", "2.0"))
+    ingest_max_attempts: int = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+    ingest_job_timeout: int = int(os.getenv("INGEST_JOB_TIMEOUT", "900"))  # seconds before a running job is requeued
+    bulk_ingest_threads: int = int(os.getenv("BULK_INGEST_THREADS", "8"))  # LLM + embedding + DB
+
+    # Uploads / PDF parsing
+    upload_spool_dir: str = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "cvstack-uploads"))
+    # An explicit UPLOAD_SPOOL_DIR is taken to be mounted on every worker host; otherwise spooled uploads
+    # are pinned to this host's workers (or carried as bytes when the API runs no workers)
+    upload_spool_shared: bool = bool(os.getenv("UPLOAD_SPOOL_DIR"))
+    upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+    pdf_max_pages: int = int(os.getenv("PDF_MAX_PAGES", "50"))
+    pdf_timeout: float = float(os.getenv("PDF_TIMEOUT", "60"))  # seconds per document
+    pdf_pages_per_task: int = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
 
     # App
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
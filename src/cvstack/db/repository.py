@@ -1,138 +1,460 @@
 from __future__ import annotations
 import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 import psycopg   #psycopg allows your Python application to connect to a PostgreSQL database, send SQL queries, and get results back
 from pgvector.psycopg import register_vector
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
 from psycopg.types.json import Json
+from psycopg_pool import ConnectionPool
 from ..config import settings
+from ..schemas.search import SearchFilters
 
 log = logging.getLogger(__name__)
 
+# Application-wide connection pool (opened at API startup, see open_pool)
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+VECTOR_STORAGES = ("vector", "halfvec", "binary")
+VECTOR_TABLES = ("section_vectors", "skill_vectors")
+# pgvector rejects hnsw.ef_search outside 1..1000
+HNSW_MAX_EF_SEARCH = 1000
+
+# Checkout metrics measured around pool.connection(), on top of psycopg_pool's own stats
+_checkout_stats: Dict[str, float] = {"checkouts": 0, "checkout_wait_ms": 0.0, "checkout_wait_max_ms": 0.0}
+
+
+def _conninfo() -> str:
+    return make_conninfo(
+        host=settings.pg_host,
+        port=settings.pg_port,
+        dbname=settings.pg_db,
+        user=settings.pg_user,
+        password=settings.pg_password,
+    )
+
+
+def _configure_connection(conn: psycopg.Connection) -> None:
+    # numpy arrays <-> pgvector in binary, instead of formatting/parsing float text
+    register_vector(conn)
+    conn.commit()  # the type lookup opened a transaction; pooled connections must come back idle
+
+
+def open_pool() -> ConnectionPool:
+    """Create and open the shared connection pool (idempotent)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                _conninfo(),
+                min_size=settings.pg_pool_min_size,
+                max_size=settings.pg_pool_max_size,
+                timeout=settings.pg_pool_timeout,
+                max_idle=settings.pg_pool_max_idle,
+                max_lifetime=settings.pg_pool_max_lifetime,
+                check=ConnectionPool.check_connection,
+                configure=_configure_connection,
+                name="cvstack",
+                open=False,
+            )
+            _pool.open(wait=True, timeout=settings.pg_pool_timeout)
+            log.info(
+                f"Opened DB pool (min={settings.pg_pool_min_size}, max={settings.pg_pool_max_size})"
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+            log.info("Closed DB pool")
+
+
+def get_pool() -> Optional[ConnectionPool]:
+    return _pool
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Pool wait-time / checkout metrics for the /metrics endpoint."""
+    if _pool is None:
+        return {"open": False}
+    stats: Dict[str, Any] = {"open": True, **_pool.get_stats()}
+    checkouts = _checkout_stats["checkouts"]
+    stats.update(_checkout_stats)
+    stats["checkout_wait_avg_ms"] = round(_checkout_stats["checkout_wait_ms"] / checkouts, 3) if checkouts else 0.0
+    return stats
+
+
+def check_vector_schema() -> None:
+    """
+    Fail fast at startup if the vector columns don't match EMBEDDING_DIM / VECTOR_STORAGE;
+    otherwise every insert would fail later, one CV at a time.
+    """
+    with pooled_repository() as repo:
+        columns = repo.vector_columns()
+    expected_type = "halfvec" if settings.vector_storage == "halfvec" else "vector"
+    for table in VECTOR_TABLES:
+        if table not in columns:
+            raise RuntimeError(f"{table}.embedding not found; run the migrations first")
+        type_name, dim = columns[table]
+        if dim != settings.embedding_dim:
+            raise RuntimeError(
+                f"{table}.embedding holds {dim}-dim vectors but EMBEDDING_DIM={settings.embedding_dim}; "
+                f"run scripts/resize_embeddings.py or change EMBEDDING_DIM"
+            )
+        if type_name != expected_type:
+            raise RuntimeError(
+                f"{table}.embedding is {type_name} but VECTOR_STORAGE={settings.vector_storage}; "
+                f"run scripts/migrate_vector_storage.py or change VECTOR_STORAGE"
+            )
+
+
+@contextmanager
+def pooled_repository() -> Iterator["Repository"]:
+    """
+    Borrow a connection from the shared pool and wrap it in a Repository.
+    The connection goes back to the pool when the block exits.
+    """
+    pool = _pool or open_pool()
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        waited_ms = (time.perf_counter() - started) * 1000
+        with _pool_lock:
+            _checkout_stats["checkouts"] += 1
+            _checkout_stats["checkout_wait_ms"] += waited_ms
+            _checkout_stats["checkout_wait_max_ms"] = max(_checkout_stats["checkout_wait_max_ms"], waited_ms)
+        yield Repository(conn)
+
+
+# Facets returned by Repository.candidate_facets, always all present (possibly empty)
+FACET_NAMES = ("industry", "country", "target_role", "currently_working", "skill_level", "skill")
+
+# Typed facet columns on candidates (migration 0011), filled from cv["facets"]
+_FACET_COLUMNS = ("industry", "target_role", "role_confidence", "country", "currently_working")
+
+
+def _facet_params(cv: Dict[str, Any]) -> Tuple[Any, ...]:
+    facets = cv.get("facets") or {}
+    return tuple(facets.get(column) for column in _FACET_COLUMNS)
+
+
+def _candidate_params(cv: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        cv.get("full_name"), cv.get("email"), cv["raw_text"], cv.get("source_hash"), cv.get("content_hash"),
+        *_facet_params(cv),
+    )
+
+
+def _reset_params(cv: Dict[str, Any]) -> Tuple[Any, ...]:
+    # content_hash is unchanged by definition
+    return (cv.get("full_name"), cv.get("email"), cv["raw_text"], cv.get("source_hash"), *_facet_params(cv), cv["candidate_id"])
+
+
+_INSERT_CANDIDATE_SQL = """
+    INSERT INTO candidates (full_name, email, raw_text, source_hash, content_hash,
+                            industry, target_role, role_confidence, country, currently_working)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (content_hash) DO NOTHING
+    RETURNING id
+"""
+
+_RESET_CANDIDATE_SQL = """
+    UPDATE candidates
+    SET full_name = %s, email = %s, raw_text = %s, source_hash = COALESCE(%s, source_hash),
+        industry = %s, target_role = %s, role_confidence = %s, country = %s, currently_working = %s
+    WHERE id = %s
+"""
+
+_INSERT_CANDIDATE_SKILL_SQL = "INSERT INTO candidate_skills (candidate_id, skill, rating) VALUES (%s, %s, %s)"
+
+# Changes whenever a catalog skill is inserted, updated or deleted (migration 0012)
+_CATALOG_VERSION_SQL = "SELECT count(*), max(updated_at) FROM skill_vectors"
+
+# Best distance per catalog skill for one candidate; callers clear the old rows first
+_CANDIDATE_MATCHES_SQL = """
+    INSERT INTO candidate_skill_matches (candidate_id, skill_id, best_distance)
+    SELECT s.candidate_id, sk.id, MIN(sv.embedding <=> sk.embedding)
+    FROM section_vectors sv
+    JOIN sections s ON s.id = sv.section_id
+    CROSS JOIN skill_vectors sk
+    WHERE s.candidate_id = %s
+    GROUP BY s.candidate_id, sk.id
+    HAVING MIN(sv.embedding <=> sk.embedding) < %s
+"""
+
+
 class Repository:
-    def __init__(self) -> None:
-        self.conn = psycopg.connect(
-            host=settings.pg_host,
-            port=settings.pg_port,
-            dbname=settings.pg_db,
-            user=settings.pg_user,
-            password=settings.pg_password,
-        )
+    def __init__(self, conn: Optional[psycopg.Connection] = None) -> None:
+        # Pooled connections are owned by the pool; only standalone ones are closed here
+        self._owns_conn = conn is None
+        self.conn = conn if conn is not None else psycopg.connect(_conninfo())
+        if self._owns_conn:
+            _configure_connection(self.conn)
+        # Column/index layout of the vector tables (see migrate_vector_storage / resize_vector_columns)
+        self.vector_storage = settings.vector_storage
+        self.embedding_dim = settings.embedding_dim
 
 
     def close(self) -> None:
+        if not self._owns_conn:
+            return
         try:
             self.conn.close()
         except Exception:
             pass
 
     
-    def insert_candidate(self, full_name: Optional[str], email: Optional[str], raw_text: str) -> int:
+    def find_candidate_by_content_hash(self, content_hash: str) -> Optional[int]:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT id FROM candidates WHERE content_hash = %s", (content_hash,))
+            row = cur.fetchone()
+            return row[0] if row else None
+
+    def find_candidates_by_source_hash(self, source_hashes: List[str]) -> Dict[str, int]:
+        """Map already-ingested file hashes to their candidate id."""
+        if not source_hashes:
+            return {}
         with self.conn.cursor() as cur:
             cur.execute(
-                """
-                INSERT INTO candidates (full_name, email, raw_text)
-                VALUES (%s, %s, %s)
-                RETURNING id
-                """,
-                (full_name, email, raw_text),
+                "SELECT source_hash, MIN(id) FROM candidates WHERE source_hash = ANY(%s) GROUP BY source_hash",
+                (source_hashes,),
             )
-            candidate_id = cur.fetchone()[0]
-            self.conn.commit()
-            return candidate_id
+            return {row[0]: row[1] for row in cur.fetchall()}
 
 
-    def insert_sections(self, section_rows: List[Tuple[int, str, Dict[str, Any], str]]) -> List[int]:
-        ids: List[int] = []
-        with self.conn.cursor() as cur:
-            for r in section_rows:
-                cur.execute(
-                    "INSERT INTO sections (candidate_id, topic, payload, text_for_embedding) VALUES (%s, %s, %s, %s) RETURNING id",
-                    (r[0], r[1], Json(r[2]), r[3]),
-                )
-                ids.append(cur.fetchone()[0])
-            self.conn.commit()
-        return ids
+    # --- Saving a parsed CV ---
+    # A "CV record" is a dict with full_name, email, raw_text, source_hash, content_hash,
+    # sections (rows from build_sections; their candidate_id slot is ignored), vectors
+    # (index-aligned with sections, None for blanks), candidate_id (set only when a
+    # forced re-extraction replaces an existing candidate in place), facets (see
+    # services/facets.py), skills: [(skill, rating)] and optionally
+    # skill_matches: [(skill_id, best_distance)] already computed against the catalog
+    # whose version (Repository.skill_catalog_version) is in catalog_version.
 
-    def insert_vectors(self, section_ids: List[int], vectors: List[List[float]]) -> None:
-        if not vectors:
-            print("No vectors to insert")
-            return
+    def save_parsed_cv(self, cv: Dict[str, Any]) -> Optional[int]:
+        """
+        Write one CV (candidate, sections, vectors, skill matches) in a single transaction,
+        using one multi-row INSERT per table and a binary COPY for the vectors. Returns the
+        candidate id, or None when a candidate with the same content_hash already exists
+        (nothing is written).
+        """
+        self._check_vectors_aligned(cv)
         try:
             with self.conn.cursor() as cur:
-                print(f"Inserting {len(vectors)} vectors...")
-                cur.executemany(
-                    "INSERT INTO section_vectors (section_id, embedding) VALUES (%s, %s)",
-                    list(zip(section_ids, vectors)),
-                )
-                self.conn.commit()
-                print("Vectors inserted successfully")
-        except Exception as e:
-            print(f"Error inserting vectors: {e}")
+                candidate_id = self._write_candidate(cur, cv)
+                if candidate_id is None:
+                    self.conn.rollback()
+                    return None
+
+                section_ids: List[int] = []
+                if cv["sections"]:
+                    query = sql.SQL(
+                        "INSERT INTO sections (candidate_id, topic, payload, text_for_embedding) VALUES {} RETURNING id"
+                    ).format(sql.SQL(", ").join(sql.SQL("(%s, %s, %s, %s)") for _ in cv["sections"]))
+                    params = [v for r in cv["sections"] for v in (candidate_id, r[1], Json(r[2]), r[3])]
+                    cur.execute(query, params)
+                    # Ids are drawn from the serial in VALUES order, so sorting restores the row order
+                    section_ids = sorted(row[0] for row in cur.fetchall())
+                self._write_candidate_skills(cur, [(candidate_id, cv)])
+
+                pairs = [(sid, vec) for sid, vec in zip(section_ids, cv["vectors"]) if vec is not None]
+                if pairs:
+                    self._copy_vectors(cur, pairs)
+                    self._write_skill_matches(cur, [(candidate_id, cv)])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        log.info(f"Saved candidate {candidate_id}: {len(section_ids)} sections, {len(pairs)} vectors")
+        return candidate_id
+
+    def save_parsed_cvs(self, cvs: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Bulk variant of save_parsed_cv for backfills. The whole batch is sent in
+        psycopg pipeline mode (a few round trips in total rather than several per CV)
+        and committed once. Returns one candidate id (or None for duplicates) per CV.
+        """
+        for cv in cvs:
+            self._check_vectors_aligned(cv)
+        if not cvs:
+            return []
+
+        candidate_ids: List[Optional[int]] = [cv.get("candidate_id") for cv in cvs]
+        new = [i for i, cv in enumerate(cvs) if cv.get("candidate_id") is None]
+        replaced = [cv["candidate_id"] for cv in cvs if cv.get("candidate_id") is not None]
+        try:
+            with self.conn.pipeline(), self.conn.cursor() as cur:
+                if new:
+                    cur.executemany(_INSERT_CANDIDATE_SQL, [_candidate_params(cvs[i]) for i in new], returning=True)
+                    for i in new:
+                        row = cur.fetchone()
+                        candidate_ids[i] = row[0] if row else None
+                        cur.nextset()
+                if replaced:
+                    cur.executemany(_RESET_CANDIDATE_SQL, [_reset_params(cv) for cv in cvs if cv.get("candidate_id") is not None])
+                    cur.execute("DELETE FROM sections WHERE candidate_id = ANY(%s)", (replaced,))
+                    cur.execute("DELETE FROM candidate_skill_matches WHERE candidate_id = ANY(%s)", (replaced,))
+                    cur.execute("DELETE FROM candidate_skills WHERE candidate_id = ANY(%s)", (replaced,))
+                self._write_candidate_skills(cur, [(cid, cv) for cid, cv in zip(candidate_ids, cvs) if cid is not None])
+
+                # One result set per row, so section ids line up with the rows exactly
+                section_params = []
+                section_vectors: List[Optional[np.ndarray]] = []
+                for candidate_id, cv in zip(candidate_ids, cvs):
+                    if candidate_id is None:
+                        continue
+                    section_params.extend((candidate_id, r[1], Json(r[2]), r[3]) for r in cv["sections"])
+                    section_vectors.extend(cv["vectors"])
+                section_ids: List[int] = []
+                if section_params:
+                    cur.executemany(
+                        "INSERT INTO sections (candidate_id, topic, payload, text_for_embedding) "
+                        "VALUES (%s, %s, %s, %s) RETURNING id",
+                        section_params,
+                        returning=True,
+                    )
+                    while True:
+                        section_ids.append(cur.fetchone()[0])
+                        if not cur.nextset():
+                            break
+
+            # COPY cannot run in pipeline mode, so vectors and matches follow in the same transaction
+            pairs = [(sid, vec) for sid, vec in zip(section_ids, section_vectors) if vec is not None]
+            if pairs:
+                with self.conn.cursor() as cur:
+                    self._copy_vectors(cur, pairs)
+                    self._write_skill_matches(cur, [(cid, cv) for cid, cv in zip(candidate_ids, cvs) if cid is not None])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
             raise
 
-    def search_candidates_by_skill_catalog(self, limit: int = 50) -> List[Dict[str, Any]]:
+        log.info(
+            f"Saved {sum(cid is not None for cid in candidate_ids)}/{len(cvs)} candidates in one batch "
+            f"({len(section_ids)} sections, {len(pairs)} vectors)"
+        )
+        return candidate_ids
+
+    def _copy_vectors(self, cur: psycopg.Cursor, pairs: List[Tuple[int, np.ndarray]]) -> None:
+        # Binary COPY: 4 bytes per dimension on the wire and no float formatting on either side.
+        # Binary COPY does no casting, so halfvec columns get halfvec-encoded rows.
+        column_type = "halfvec" if self.vector_storage == "halfvec" else "vector"
+        with cur.copy("COPY section_vectors (section_id, embedding) FROM STDIN WITH (FORMAT BINARY)") as copy:
+            copy.set_types(["int8", column_type])
+            for section_id, vector in pairs:
+                copy.write_row((section_id, vector))
+
+    @staticmethod
+    def _write_skill_matches(cur: psycopg.Cursor, saved: List[Tuple[int, Dict[str, Any]]]) -> None:
+        # cv["skill_matches"] (precomputed in-process by the catalog index) is inserted as-is
+        # when it was scored against the catalog version still in the DB; other CVs are
+        # scored against the catalog by Postgres
+        if any(cv.get("skill_matches") is not None for _, cv in saved):
+            cur.execute(_CATALOG_VERSION_SQL)
+            version = tuple(cur.fetchone())
+            saved = [
+                (candidate_id, cv if cv.get("catalog_version") == version else {**cv, "skill_matches": None})
+                for candidate_id, cv in saved
+            ]
+        rows = [
+            (candidate_id, skill_id, distance)
+            for candidate_id, cv in saved if cv.get("skill_matches") is not None
+            for skill_id, distance in cv["skill_matches"]
+        ]
+        if rows:
+            cur.executemany(
+                "INSERT INTO candidate_skill_matches (candidate_id, skill_id, best_distance) VALUES (%s, %s, %s)",
+                rows,
+            )
+        in_db = [(candidate_id, settings.skill_match_threshold) for candidate_id, cv in saved if cv.get("skill_matches") is None]
+        if in_db:
+            cur.executemany(_CANDIDATE_MATCHES_SQL, in_db)
+
+    @staticmethod
+    def _write_candidate_skills(cur: psycopg.Cursor, saved: List[Tuple[int, Dict[str, Any]]]) -> None:
+        rows = [(candidate_id, skill, rating) for candidate_id, cv in saved for skill, rating in cv.get("skills") or []]
+        if rows:
+            cur.executemany(_INSERT_CANDIDATE_SKILL_SQL, rows)
+
+    @staticmethod
+    def _check_vectors_aligned(cv: Dict[str, Any]) -> None:
+        if len(cv["sections"]) != len(cv["vectors"]):
+            raise ValueError(f"CV record has {len(cv['sections'])} sections but {len(cv['vectors'])} vectors")
+
+    def _write_candidate(self, cur: psycopg.Cursor, cv: Dict[str, Any]) -> Optional[int]:
+        if cv.get("candidate_id") is not None:
+            # Forced re-extraction: keep the candidate id, drop its derived rows
+            cur.execute(_RESET_CANDIDATE_SQL, _reset_params(cv))
+            cur.execute("DELETE FROM sections WHERE candidate_id = %s", (cv["candidate_id"],))
+            cur.execute("DELETE FROM candidate_skill_matches WHERE candidate_id = %s", (cv["candidate_id"],))
+            cur.execute("DELETE FROM candidate_skills WHERE candidate_id = %s", (cv["candidate_id"],))
+            return cv["candidate_id"]
+        cur.execute(_INSERT_CANDIDATE_SQL, _candidate_params(cv))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def search_candidates_by_skill_catalog(
+        self, limit: int = 50, after: Optional[Tuple[float, int]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Ranks candidates using Weighted Scoring.
         Essential skills contribute MORE to the score than Nice-to-Have.
+        Reads the precomputed candidate_skill_matches table, so the cost no longer
+        grows with sections x skills.
+        Ordered by (score DESC, candidate_id); `after` = (score, candidate_id) of the last
+        row already shown resumes from there (keyset pagination).
         """
         sql = """
-        WITH skill_matches AS (
-            SELECT 
-                c.id AS candidate_id,
-                c.full_name,
-                c.email,
-                sk.skill_name,
-                sk.weight,  -- <--- We select the weight here
-                (sv.embedding <=> sk.embedding) AS distance
-            FROM section_vectors sv
-            JOIN sections s ON s.id = sv.section_id
-            JOIN candidates c ON c.id = s.candidate_id
-            CROSS JOIN skill_vectors sk
-        ),
-        best_matches AS (
-            -- Find best match per skill
-            SELECT 
-                candidate_id,
-                full_name,
-                email,
-                skill_name,
-                weight,
-                MIN(distance) as best_distance
-            FROM skill_matches
-            WHERE distance < 0.65  -- Threshold for a "Good Match"
-            GROUP BY candidate_id, full_name, email, skill_name, weight
-        ),
-        candidate_scores AS (
+        WITH candidate_scores AS (
             SELECT 
-                candidate_id,
-                full_name,
-                email,
-                ARRAY_AGG(skill_name) AS matched_skills,
-                
-                -- --- NEW FORMULA ---
+                m.candidate_id,
+                ARRAY_AGG(sk.skill_name ORDER BY m.best_distance) AS matched_skills,
+
                 -- Score = Skill Weight + (Match Quality Bonus)
                 -- Example: Essential (10) + Perfect Match (0 distance) = 11 points
                 -- Example: Nice-to-Have (5) + Perfect Match = 6 points
-                SUM(weight + (1 - best_distance)) AS total_score
-                
-            FROM best_matches
-            GROUP BY candidate_id, full_name, email
+                SUM(sk.weight + (1 - m.best_distance)) AS total_score
+
+            FROM candidate_skill_matches m
+            JOIN skill_vectors sk ON sk.id = m.skill_id
+            WHERE m.best_distance < %(threshold)s  -- Threshold for a "Good Match"
+            GROUP BY m.candidate_id
         )
         SELECT 
-            candidate_id,
-            full_name,
-            email,
-            matched_skills,
-            ROUND(total_score::numeric, 1) AS match_score
-        FROM candidate_scores
-        ORDER BY total_score DESC
-        LIMIT %s;
+            cs.candidate_id,
+            c.full_name,
+            c.email,
+            cs.matched_skills,
+            ROUND(cs.total_score::numeric, 1) AS match_score,
+            cs.total_score
+        FROM candidate_scores cs
+        JOIN candidates c ON c.id = cs.candidate_id
+        WHERE %(after_score)s::float8 IS NULL
+           OR cs.total_score < %(after_score)s
+           OR (cs.total_score = %(after_score)s AND cs.candidate_id > %(after_id)s)
+        ORDER BY cs.total_score DESC, cs.candidate_id
+        LIMIT %(limit)s;
         """
+        params = {
+            "threshold": settings.skill_match_threshold,
+            "after_score": after[0] if after else None,
+            "after_id": after[1] if after else None,
+            "limit": limit,
+        }
         
         try:
             with self.conn.cursor() as cur:
-                cur.execute(sql, (limit,))
+                cur.execute(sql, params)
                 rows = cur.fetchall()
 
             return [
@@ -142,27 +464,984 @@ class Repository:
                     "full_name": row[1],      
                     "email": row[2],
                     "matched_skills": row[3],
-                    "match_score": row[4]
+                    "match_score": row[4],
+                    "score": row[5],
                 }
                 for row in rows
             ]
             
         except Exception as e:
             print(f"Error in catalog search: {e}")
+            self.conn.rollback()
             return []
-        
-    def upsert_skill_vectors(self, skills: List[Dict[str, str]], vectors: List[List[float]]) -> None:
+
+    # --- ANN vector search ---
+
+    def _apply_search_tuning(
+        self,
+        cur: psycopg.Cursor,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        filtered: bool = False,
+    ) -> None:
+        """
+        Set the recall/latency knobs for the current transaction only.
+        Always sets every knob so values from an earlier query can't leak into this one.
+        exact=True disables index scans, giving the brute-force ranking used as ground truth.
+        filtered=True turns on pgvector's iterative index scans, so a filtered query (or one
+        whose LIMIT is above ef_search) keeps walking the index until LIMIT rows are found
+        instead of returning too few. ef_search is capped at HNSW_MAX_EF_SEARCH.
+        """
+        cur.execute(
+            """
+            SELECT set_config('hnsw.ef_search', %s, true),
+                   set_config('ivfflat.probes', %s, true),
+                   set_config('enable_indexscan', %s, true)
+            """,
+            (
+                str(min(ef_search or settings.hnsw_ef_search, HNSW_MAX_EF_SEARCH)),
+                str(probes or settings.ivfflat_probes),
+                "off" if exact else "on",
+            ),
+        )
+        if settings.vector_iterative_scan != "none":  # "none": pgvector < 0.8 has no such setting
+            # ivfflat only implements relaxed_order
+            mode = settings.vector_iterative_scan if filtered else "off"
+            cur.execute(
+                "SELECT set_config('hnsw.iterative_scan', %s, true), set_config('ivfflat.iterative_scan', %s, true)",
+                (mode, "off" if mode == "off" else "relaxed_order"),
+            )
+
+    def _nearest_sections_sql(self, exact: bool = False, where: Optional[sql.Composable] = None) -> sql.Composed:
+        """
+        `SELECT section_id, distance ... LIMIT %(limit)s` for the query vector %(q)b,
+        ordered the way the current storage mode's index can serve. In binary mode the
+        index ranks by Hamming distance over bit-quantized vectors and the top
+        %(candidates)s are re-ranked by float32 cosine distance (unless re-rank is off).
+        `where` (see _filter_sql) filters on the section row `s` inside the index scan.
+        """
+        # Query vectors always go out as float32 `vector`; halfvec columns need them cast
+        q = sql.SQL("%(q)b::halfvec" if self.vector_storage == "halfvec" else "%(q)b")
+        order = sql.SQL("embedding <=> {}").format(q)
+        source = sql.SQL("section_vectors")
+        if where is not None:
+            source = sql.SQL("section_vectors JOIN sections s ON s.id = section_vectors.section_id WHERE {}").format(where)
+
+        if self.vector_storage == "binary" and not exact:
+            hamming = sql.SQL("binary_quantize(embedding)::bit({}) <~> binary_quantize({})").format(
+                sql.Literal(self.embedding_dim), q
+            )
+            if settings.vector_rerank_candidates <= 0:
+                order = hamming
+            else:
+                return sql.SQL("""
+                    SELECT section_id, distance
+                    FROM (
+                        SELECT section_id, embedding <=> {q} AS distance
+                        FROM {source}
+                        ORDER BY {hamming}
+                        LIMIT %(candidates)s
+                    ) candidates
+                    ORDER BY distance
+                    LIMIT %(limit)s
+                """).format(q=q, source=source, hamming=hamming)
+
+        return sql.SQL("""
+            SELECT section_id, embedding <=> {q} AS distance
+            FROM {source}
+            ORDER BY {order}
+            LIMIT %(limit)s
+        """).format(q=q, source=source, order=order)
+
+    def nearest_sections(
+        self,
+        query_vector: np.ndarray,
+        k: int = 10,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+    ) -> List[Tuple[int, float]]:
+        """Top-k (section_id, cosine distance) for a query vector."""
+        params = {"q": query_vector, "limit": k, "candidates": max(k, settings.vector_rerank_candidates)}
+        with self.conn.cursor() as cur:
+            self._apply_search_tuning(cur, ef_search, probes, exact)
+            cur.execute(self._nearest_sections_sql(exact), params)
+            return [(row[0], row[1]) for row in cur.fetchall()]
+
+    @staticmethod
+    def _filter_sql(
+        filters: Optional[SearchFilters],
+        candidate_id: sql.Composable = sql.SQL("s.candidate_id"),
+        topic: Optional[sql.Composable] = sql.SQL("s.topic"),
+    ) -> Tuple[Optional[sql.Composable], Dict[str, Any]]:
+        """
+        Compile SearchFilters to a predicate plus its named params. Candidate-level filters
+        become `candidate_id IN (...)` over the typed facet columns on candidates and over
+        candidate_skills, each served by a B-tree index; topics filter the section row `s`
+        itself (topic=None: rows that are not sections, which a topics filter excludes).
+        Returns (None, {}) when nothing is filtered.
+        """
+        if filters is None or filters.is_empty():
+            return None, {}
+        predicates: List[sql.Composable] = []
+        params: Dict[str, Any] = {}
+
+        facets: List[sql.Composable] = []
+        for column in ("industry", "target_role", "country", "currently_working"):
+            value = getattr(filters, column)
+            if value is not None:
+                params[f"f_{column}"] = value
+                facets.append(sql.SQL("{} = {}").format(sql.Identifier(column), sql.Placeholder(f"f_{column}")))
+        if facets:
+            predicates.append(sql.SQL("{} IN (SELECT id FROM candidates WHERE {})").format(
+                candidate_id, sql.SQL(" AND ").join(facets)
+            ))
+
+        if filters.skill is not None or filters.min_system_rating is not None:
+            skill_terms: List[sql.Composable] = []
+            if filters.skill is not None:
+                params["f_skill"] = filters.skill
+                skill_terms.append(sql.SQL("lower(skill) = lower(%(f_skill)s)"))
+            if filters.min_system_rating is not None:
+                params["f_rating"] = filters.min_system_rating
+                skill_terms.append(sql.SQL("rating >= %(f_rating)s"))
+            predicates.append(sql.SQL("{} IN (SELECT candidate_id FROM candidate_skills WHERE {})").format(
+                candidate_id, sql.SQL(" AND ").join(skill_terms)
+            ))
+
+        if filters.topics:
+            params["f_topics"] = list(filters.topics)
+            predicates.append(sql.SQL("{} = ANY(%(f_topics)s)").format(topic) if topic is not None else sql.SQL("false"))
+        return sql.SQL(" AND ").join(predicates), params
+
+    def _candidate_search_sql(self, where: Optional[sql.Composable] = None) -> sql.Composed:
+        """
+        Nearest sections (the index-served query above, materialized so the planner keeps
+        its ORDER BY ... LIMIT shape) collapsed to the best section per candidate.
+        """
+        return sql.SQL("""
+            WITH hits AS MATERIALIZED ({nearest})
+            SELECT candidate_id, full_name, email, topic, snippet, distance
+            FROM (
+                SELECT DISTINCT ON (s.candidate_id)
+                    s.candidate_id, c.full_name, c.email, s.topic,
+                    LEFT(s.text_for_embedding, %(snippet)s) AS snippet, h.distance
+                FROM hits h
+                JOIN sections s ON s.id = h.section_id
+                JOIN candidates c ON c.id = s.candidate_id
+                ORDER BY s.candidate_id, h.distance
+            ) best
+            ORDER BY distance, candidate_id
+            LIMIT %(k)s
+        """).format(nearest=self._nearest_sections_sql(where=where))
+
+    def _search_params(self, query_vector: np.ndarray, limit: int) -> Dict[str, Any]:
+        # A candidate usually owns several of the nearest sections, so fetch more sections than candidates
+        sections = limit * max(1, settings.search_section_overfetch)
+        return {
+            "q": query_vector,
+            "limit": sections,
+            "candidates": max(sections, settings.vector_rerank_candidates),
+            "snippet": settings.search_snippet_chars,
+            "k": limit,
+        }
+
+    def _search_candidates(
+        self,
+        query_vector: np.ndarray,
+        limit: int,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        matched_skill: Optional[str] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[Dict[str, Any]]:
+        where, filter_params = self._filter_sql(filters)
+        params = {**self._search_params(query_vector, limit), **filter_params}
+        # HNSW returns at most ef_search rows, so it can't be below the section over-fetch; past
+        # pgvector's cap, iterative scans fetch the rest
+        ef_search = min(max(ef_search or settings.hnsw_ef_search, params["limit"]), HNSW_MAX_EF_SEARCH)
+        with self.conn.cursor() as cur:
+            self._apply_search_tuning(cur, ef_search, probes, filtered=where is not None or params["limit"] > ef_search)
+            cur.execute(self._candidate_search_sql(where), params)
+            rows = cur.fetchall()
+
+        return [
+            {
+                "candidate_id": row[0],
+                "name": row[1],
+                "full_name": row[1],
+                "email": row[2],
+                "topic": row[3],
+                "snippet": row[4],
+                "distance": row[5],
+                "matched_skills": [matched_skill or row[3]],
+                "match_score": round(1 - row[5], 3),
+                "score": 1 - row[5],
+            }
+            for row in rows
+        ]
+
+    def search_by_skill(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 50,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top candidates for a free-text query vector, each with its best matching section."""
+        return self._search_candidates(query_vector, limit, ef_search, probes, filters=filters)
+
+    def get_skill_vector(self, skill_name: str) -> Optional[np.ndarray]:
+        with self.conn.cursor(binary=True) as cur:
+            cur.execute("SELECT embedding::vector FROM skill_vectors WHERE skill_name = %s", (skill_name,))
+            row = cur.fetchone()
+            if row is None:
+                # Fall back to a case-insensitive match for names typed by hand
+                cur.execute(
+                    "SELECT embedding::vector FROM skill_vectors WHERE lower(skill_name) = lower(%s) ORDER BY id LIMIT 1",
+                    (skill_name,),
+                )
+                row = cur.fetchone()
+        return row[0] if row else None
+
+    def search_candidates_by_single_skill(
+        self, skill_name: str, limit: int = 50, filters: Optional[SearchFilters] = None
+    ) -> List[Dict[str, Any]]:
+        """Top candidates for one catalog skill, searched with the skill's stored embedding."""
+        query_vector = self.get_skill_vector(skill_name)
+        if query_vector is None:
+            log.warning(f"Skill not in catalog: {skill_name!r}")
+            return []
+        return self._search_candidates(query_vector, limit, matched_skill=skill_name, filters=filters)
+
+    def search_by_text(self, query: str, limit: int = 50, filters: Optional[SearchFilters] = None) -> List[Dict[str, Any]]:
+        """
+        Lexical top candidates for a recruiter query, over the generated search_tsv columns
+        (GIN-indexed). Sections and the candidate headline both count; a candidate scores
+        its best hit, ranked with length-normalized ts_rank_cd. The headline is no section,
+        so a topics filter leaves only section hits.
+        """
+        section_filter, params = self._filter_sql(filters)
+        headline_filter, _ = self._filter_sql(filters, sql.SQL("c.id"), topic=None)
+        text_sql = sql.SQL("""
+        WITH q AS (SELECT websearch_to_tsquery('english', %(query)s) AS query),
+        section_hits AS (
+            SELECT DISTINCT ON (s.candidate_id)
+                s.candidate_id, s.topic, LEFT(s.text_for_embedding, %(snippet)s) AS snippet,
+                ts_rank_cd(s.search_tsv, q.query, 1) AS rank
+            FROM sections s, q
+            WHERE s.search_tsv @@ q.query AND {section_filter}
+            ORDER BY s.candidate_id, rank DESC
+        ),
+        headline_hits AS (
+            SELECT c.id AS candidate_id, ts_rank_cd(c.search_tsv, q.query, 1) AS rank
+            FROM candidates c, q
+            WHERE c.search_tsv @@ q.query AND {headline_filter}
+        )
+        SELECT c.id, c.full_name, c.email, sh.topic, sh.snippet, GREATEST(sh.rank, hh.rank) AS rank
+        FROM section_hits sh
+        FULL JOIN headline_hits hh USING (candidate_id)
+        JOIN candidates c ON c.id = candidate_id
+        ORDER BY rank DESC, c.id
+        LIMIT %(limit)s;
+        """).format(
+            section_filter=section_filter or sql.SQL("true"),
+            headline_filter=headline_filter or sql.SQL("true"),
+        )
+        params.update({"query": query, "snippet": settings.search_snippet_chars, "limit": limit})
+        with self.conn.cursor() as cur:
+            cur.execute(text_sql, params)
+            rows = cur.fetchall()
+
+        return [
+            {
+                "candidate_id": row[0],
+                "name": row[1],
+                "full_name": row[1],
+                "email": row[2],
+                "topic": row[3],
+                "snippet": row[4],
+                "text_score": row[5],
+                "matched_skills": [row[3]] if row[3] else [],
+                "match_score": round(row[5], 3),
+                "score": row[5],
+            }
+            for row in rows
+        ]
+
+    def candidate_facets(
+        self,
+        candidate_ids: Optional[List[int]] = None,
+        filters: Optional[SearchFilters] = None,
+        top_skills: Optional[int] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Facet counts over a matched candidate set (candidate_ids, or when None every
+        candidate passing filters), in one statement: one GROUPING SETS pass over the
+        facet columns plus the most common skills. skill_level buckets each candidate's
+        best rating (of filters.skill when given) like level_of_skill does.
+        """
+        if candidate_ids is not None:
+            scope, params = sql.SQL("c.id = ANY(%(ids)s)"), {"ids": candidate_ids}
+        else:
+            scope, params = self._filter_sql(filters.model_copy(update={"topics": None}) if filters else None, sql.SQL("c.id"))
+        skill = filters.skill if filters is not None else None
+        params.update({"f_skill": skill, "top_skills": top_skills or settings.facet_top_skills})
+
+        query = sql.SQL("""
+            WITH matched AS MATERIALIZED (
+                SELECT c.id, c.industry, c.country, c.target_role, c.currently_working
+                FROM candidates c
+                WHERE {scope}
+            ),
+            levels AS (
+                SELECT m.*,
+                       CASE WHEN best.rating >= 7 THEN 'expert'
+                            WHEN best.rating >= 5 THEN 'advanced'
+                            WHEN best.rating >= 3 THEN 'intermediate'
+                            WHEN best.rating >= 1 THEN 'beginner' END AS skill_level
+                FROM matched m
+                LEFT JOIN LATERAL (
+                    SELECT MAX(cs.rating) AS rating
+                    FROM candidate_skills cs
+                    WHERE cs.candidate_id = m.id
+                      AND (%(f_skill)s::text IS NULL OR lower(cs.skill) = lower(%(f_skill)s::text))
+                ) best ON true
+            )
+            SELECT CASE WHEN GROUPING(industry) = 0 THEN 'industry'
+                        WHEN GROUPING(country) = 0 THEN 'country'
+                        WHEN GROUPING(target_role) = 0 THEN 'target_role'
+                        WHEN GROUPING(currently_working) = 0 THEN 'currently_working'
+                        ELSE 'skill_level' END,
+                   COALESCE(industry, country, target_role, currently_working::text, skill_level),
+                   COUNT(*)
+            FROM levels
+            GROUP BY GROUPING SETS ((industry), (country), (target_role), (currently_working), (skill_level))
+            UNION ALL
+            (
+                SELECT 'skill', MIN(cs.skill), COUNT(*)
+                FROM candidate_skills cs
+                JOIN matched m ON m.id = cs.candidate_id
+                GROUP BY lower(cs.skill)
+                ORDER BY COUNT(*) DESC, lower(cs.skill)
+                LIMIT %(top_skills)s
+            )
+        """).format(scope=scope or sql.SQL("true"))
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+        facets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in FACET_NAMES}
+        for facet, value, count in rows:
+            facets[facet].append({"value": value, "count": count})
+        for values in facets.values():
+            values.sort(key=lambda v: (-v["count"], v["value"] is None, v["value"] or ""))
+        return facets
+
+    def explain_candidate_search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 50,
+        seqscan: bool = True,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[str]:
+        """
+        EXPLAIN plan lines for the candidate search. seqscan=False disables sequential scans
+        for this transaction, showing whether the query shape is one the ANN index can serve
+        (on small tables the planner may rightly prefer a seq scan).
+        """
+        where, filter_params = self._filter_sql(filters)
+        params = {**self._search_params(query_vector, limit), **filter_params}
+        ef_search = min(max(settings.hnsw_ef_search, params["limit"]), HNSW_MAX_EF_SEARCH)
+        with self.conn.cursor() as cur:
+            self._apply_search_tuning(cur, ef_search, filtered=where is not None or params["limit"] > ef_search)
+            cur.execute("SELECT set_config('enable_seqscan', %s, true)", ("on" if seqscan else "off",))
+            cur.execute(sql.SQL("EXPLAIN {}").format(self._candidate_search_sql(where)), params)
+            lines = [row[0] for row in cur.fetchall()]
+        self.conn.rollback()
+        return lines
+
+    def rebuild_vector_indexes(
+        self,
+        method: Optional[str] = None,
+        lists: Optional[int] = None,
+        m: int = 16,
+        ef_construction: int = 64,
+    ) -> None:
+        """
+        (Re)create the ANN indexes on section_vectors / skill_vectors for the current
+        storage mode (cosine on vector/halfvec, Hamming on the bit-quantized vectors).
+        method is "hnsw" or "ivfflat"; for ivfflat, lists defaults to rows/1000
+        (sqrt(rows) above 1M rows), following the pgvector guidance.
+        """
+        method = method or settings.vector_index_method
+        if method not in ("hnsw", "ivfflat"):
+            raise ValueError(f"Unknown vector index method: {method}")
+
+        if self.vector_storage == "halfvec":
+            target = sql.SQL("embedding halfvec_cosine_ops")
+        elif self.vector_storage == "binary":
+            target = sql.SQL("(binary_quantize(embedding)::bit({})) bit_hamming_ops").format(
+                sql.Literal(self.embedding_dim)
+            )
+        else:
+            target = sql.SQL("embedding vector_cosine_ops")
+
+        with self.conn.cursor() as cur:
+            for table in VECTOR_TABLES:
+                if method == "hnsw":
+                    options = sql.SQL("WITH (m = {}, ef_construction = {})").format(
+                        sql.Literal(m), sql.Literal(ef_construction)
+                    )
+                else:
+                    table_lists = lists
+                    if table_lists is None:
+                        cur.execute(sql.SQL("SELECT count(*) FROM {}").format(sql.Identifier(table)))
+                        rows = cur.fetchone()[0]
+                        table_lists = max(1, rows // 1000) if rows <= 1_000_000 else int(rows ** 0.5)
+                    options = sql.SQL("WITH (lists = {})").format(sql.Literal(table_lists))
+
+                self._drop_vector_indexes(cur, table)
+                log.info(f"Building {method} index on {table} ({self.vector_storage} storage)...")
+                cur.execute(
+                    sql.SQL("CREATE INDEX {} ON {} USING {} ({}) {}").format(
+                        sql.Identifier(f"{table}_embed_{method}_idx"),
+                        sql.Identifier(table),
+                        sql.SQL(method),
+                        target,
+                        options,
+                    )
+                )
+            self.conn.commit()
+
+    @staticmethod
+    def _drop_vector_indexes(cur: psycopg.Cursor, table: str) -> None:
+        for name in (f"{table}_embed_hnsw_idx", f"{table}_embed_ivfflat_idx", f"{table}_embed_idx"):
+            cur.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(name)))
+
+    def migrate_vector_storage(self, storage: str, method: Optional[str] = None) -> None:
+        """
+        Convert the embedding columns of section_vectors / skill_vectors in place
+        (halfvec columns for "halfvec", float32 vector columns otherwise) and
+        rebuild their indexes. Going from halfvec back to float32 cannot restore the
+        precision that was dropped.
+        """
+        if storage not in VECTOR_STORAGES:
+            raise ValueError(f"Unknown vector storage: {storage}")
+        column_type = sql.SQL("{}({})").format(
+            sql.SQL("halfvec" if storage == "halfvec" else "vector"), sql.Literal(self.embedding_dim)
+        )
+        with self.conn.cursor() as cur:
+            for table in VECTOR_TABLES:
+                # Indexes built with another operator class would block the type change
+                self._drop_vector_indexes(cur, table)
+                log.info(f"Converting {table}.embedding to {column_type.as_string(self.conn)}...")
+                cur.execute(sql.SQL("ALTER TABLE {} ALTER COLUMN embedding TYPE {} USING embedding::{}").format(
+                    sql.Identifier(table), column_type, column_type
+                ))
+            self.conn.commit()
+        self.vector_storage = storage
+        self.rebuild_vector_indexes(method)
+
+    def vector_columns(self) -> Dict[str, Tuple[str, int]]:
+        """{table: (type name, dimensions)} for the embedding column of each vector table."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT c.relname, t.typname, a.atttypmod
+                FROM pg_attribute a
+                JOIN pg_class c ON c.oid = a.attrelid
+                JOIN pg_type t ON t.oid = a.atttypid
+                WHERE c.relname = ANY(%s) AND c.relkind = 'r' AND a.attname = 'embedding' AND NOT a.attisdropped
+                """,
+                (list(VECTOR_TABLES),),
+            )
+            # For vector/halfvec the type modifier is the dimension count
+            return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+    def resize_vector_columns(self, dim: int, method: Optional[str] = None) -> None:
+        """
+        Shrink the stored vectors to their first `dim` dimensions and rebuild indexes
+        and catalog matches. text-embedding-004 produces reduced sizes by truncation
+        (output_dimensionality), so this equals re-embedding at `dim`, up to scale,
+        which cosine distance ignores. Growing is impossible without re-embedding.
+        """
+        columns = self.vector_columns()
+        current = min(d for _, d in columns.values())
+        if dim > current:
+            raise ValueError(f"Cannot grow {current}-dim vectors to {dim}; re-embed instead")
+        column_type = sql.SQL("{}({})").format(
+            sql.SQL("halfvec" if self.vector_storage == "halfvec" else "vector"), sql.Literal(dim)
+        )
+        with self.conn.cursor() as cur:
+            for table in VECTOR_TABLES:
+                self._drop_vector_indexes(cur, table)
+                log.info(f"Truncating {table}.embedding to {dim} dimensions...")
+                cur.execute(
+                    sql.SQL("ALTER TABLE {} ALTER COLUMN embedding TYPE {} USING subvector(embedding, 1, {})::{}").format(
+                        sql.Identifier(table), column_type, sql.Literal(dim), column_type
+                    )
+                )
+            self.conn.commit()
+        self.embedding_dim = dim
+        self.rebuild_vector_indexes(method)
+        self.rebuild_candidate_skill_matches()
+
+    def vector_storage_sizes(self) -> Dict[str, Dict[str, int]]:
+        """Heap (incl. TOAST) and index bytes of each vector table."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT relname,
+                       pg_table_size(oid),
+                       pg_indexes_size(oid)
+                FROM pg_class
+                WHERE relname = ANY(%s) AND relkind = 'r'
+                """,
+                (list(VECTOR_TABLES),),
+            )
+            return {row[0]: {"heap_bytes": row[1], "index_bytes": row[2]} for row in cur.fetchall()}
+
+    # --- embedding cache ---
+
+    def get_cached_embeddings(self, model: str, task_type: str, text_hashes: List[str]) -> Dict[str, np.ndarray]:
+        if not text_hashes:
+            return {}
+        # Binary results: vectors arrive as float32 arrays without text parsing
+        with self.conn.cursor(binary=True) as cur:
+            cur.execute(
+                """
+                SELECT text_hash, embedding
+                FROM embedding_cache
+                WHERE model = %s AND task_type = %s AND text_hash = ANY(%s)
+                """,
+                (model, task_type, text_hashes),
+            )
+            return {row[0]: row[1] for row in cur.fetchall()}
+
+    def put_cached_embeddings(self, model: str, task_type: str, entries: List[Tuple[str, np.ndarray]]) -> None:
+        if not entries:
+            return
+        with self.conn.cursor() as cur:
+            cur.executemany(
+                """
+                INSERT INTO embedding_cache (model, task_type, text_hash, embedding)
+                VALUES (%s, %s, %s, %b)
+                ON CONFLICT (model, task_type, text_hash) DO NOTHING
+                """,
+                [(model, task_type, text_hash, vector) for text_hash, vector in entries],
+            )
+            self.conn.commit()
+
+    # --- extraction cache ---
+
+    def get_cached_extraction(self, cache_key: str, ttl_seconds: int) -> Optional[Dict[str, Any]]:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE extraction_cache SET last_used_at = now()
+                WHERE cache_key = %s AND created_at > now() - make_interval(secs => %s)
+                RETURNING result
+                """,
+                (cache_key, ttl_seconds),
+            )
+            row = cur.fetchone()
+            self.conn.commit()
+            return row[0] if row else None
+
+    def put_cached_extraction(self, cache_key: str, model: str, prompt_version: str, result: Dict[str, Any]) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO extraction_cache (cache_key, model, prompt_version, result)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    result = EXCLUDED.result, created_at = now(), last_used_at = now()
+                """,
+                (cache_key, model, prompt_version, Json(result)),
+            )
+            self.conn.commit()
+
+    def evict_extraction_cache(self, ttl_seconds: int, max_entries: int) -> int:
+        """Drop expired entries, then the least recently used ones beyond max_entries."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM extraction_cache WHERE created_at < now() - make_interval(secs => %s)",
+                (ttl_seconds,),
+            )
+            removed = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM extraction_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM extraction_cache
+                    ORDER BY last_used_at DESC
+                    OFFSET %s
+                )
+                """,
+                (max_entries,),
+            )
+            removed += cur.rowcount
+            self.conn.commit()
+            return removed
+
+    # --- ingest job queue ---
+
+    def enqueue_ingest_job(
+        self,
+        filename: Optional[str],
+        content: Optional[bytes] = None,
+        force: bool = False,
+        source_path: Optional[str] = None,
+        spool_host: Optional[str] = None,
+    ) -> int:
+        """
+        Queue a CV given either its bytes or the path of a spooled upload. spool_host marks
+        a path only readable on that host (see claim_ingest_job).
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO ingest_jobs (filename, content, force, source_path, spool_host)
+                VALUES (%s, %s, %s, %s, %s) RETURNING id
+                """,
+                (filename, content, force, source_path, spool_host),
+            )
+            job_id = cur.fetchone()[0]
+            self.conn.commit()
+            return job_id
+
+    def claim_ingest_job(self, host: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued job; concurrent workers skip rows already locked.
+        Jobs spooled to another host's local disk are left to workers on that host.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE ingest_jobs
+                SET status = 'running', started_at = now(), attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM ingest_jobs
+                    WHERE status = 'queued' AND (spool_host IS NULL OR spool_host = %s)
+                    ORDER BY id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id, filename, content, attempts, force, source_path
+                """,
+                (host,),
+            )
+            row = cur.fetchone()
+            self.conn.commit()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "filename": row[1],
+            "content": bytes(row[2] or b""),
+            "attempts": row[3],
+            "force": row[4],
+            "source_path": row[5],
+        }
+
+    def complete_ingest_job(self, job_id: int, candidate_id: Optional[int], result: Dict[str, Any]) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE ingest_jobs
+                SET status = 'done', candidate_id = %s, result = %s, error = NULL,
+                    content = NULL, finished_at = now()
+                WHERE id = %s
+                """,
+                (candidate_id, Json(result), job_id),
+            )
+            self.conn.commit()
+
+    def fail_ingest_job(self, job_id: int, error: str, retry: bool) -> None:
+        """Put the job back in the queue, or mark it failed for good."""
+        with self.conn.cursor() as cur:
+            if retry:
+                cur.execute(
+                    "UPDATE ingest_jobs SET status = 'queued', error = %s, started_at = NULL WHERE id = %s",
+                    (error, job_id),
+                )
+            else:
+                cur.execute(
+                    """
+                    UPDATE ingest_jobs
+                    SET status = 'failed', error = %s, content = NULL, finished_at = now()
+                    WHERE id = %s
+                    """,
+                    (error, job_id),
+                )
+            self.conn.commit()
+
+    def requeue_stale_ingest_jobs(self, older_than_seconds: int) -> int:
+        """Jobs left 'running' by a crashed worker go back to the queue."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE ingest_jobs SET status = 'queued', started_at = NULL
+                WHERE status = 'running' AND started_at < now() - make_interval(secs => %s)
+                """,
+                (older_than_seconds,),
+            )
+            count = cur.rowcount
+            self.conn.commit()
+            return count
+
+    def get_ingest_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT id, status, filename, candidate_id, result, error, attempts,
+                       created_at, started_at, finished_at
+                FROM ingest_jobs WHERE id = %s
+                """,
+                (job_id,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "filename": row[2],
+            "candidate_id": row[3],
+            "result": row[4],
+            "error": row[5],
+            "attempts": row[6],
+            "created_at": row[7],
+            "started_at": row[8],
+            "finished_at": row[9],
+        }
+
+    # --- candidate facets (backfill) ---
+
+    def iter_candidate_facet_sources(self, batch_size: int = 1000) -> Iterator[Dict[int, Dict[str, Any]]]:
+        """
+        Every candidate's facet-bearing section payloads, rebuilt into the parsed-CV shape
+        services/facets.py reads ({candidate_id: {"user_profile": ..., "user_skills": [...]}}),
+        in batches of candidate ids.
+        """
+        last_id = 0
+        while True:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT id FROM candidates WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch_size))
+                ids = [row[0] for row in cur.fetchall()]
+                if not ids:
+                    self.conn.commit()
+                    return
+                cur.execute(
+                    """
+                    SELECT candidate_id, topic, payload
+                    FROM sections
+                    WHERE candidate_id = ANY(%s) AND topic IN ('user_profile', 'address', 'experience', 'user_skills')
+                    ORDER BY candidate_id, id
+                    """,
+                    (ids,),
+                )
+                rows = cur.fetchall()
+            self.conn.commit()
+
+            batch: Dict[int, Dict[str, Any]] = {cid: {"experience": [], "user_skills": []} for cid in ids}
+            for candidate_id, topic, payload in rows:
+                if topic in ("experience", "user_skills"):
+                    batch[candidate_id][topic].append(payload)
+                else:
+                    batch[candidate_id][topic] = payload
+            yield batch
+            last_id = ids[-1]
+
+    def write_candidate_facets(self, rows: List[Tuple[int, Dict[str, Any], List[Tuple[str, Optional[int]]]]]) -> None:
+        """Replace the facet columns and candidate_skills rows of the given (candidate_id, facets, skills)."""
+        if not rows:
+            return
+        assignments = ", ".join(f"{column} = %s" for column in _FACET_COLUMNS)
+        try:
+            with self.conn.cursor() as cur:
+                cur.executemany(
+                    f"UPDATE candidates SET {assignments} WHERE id = %s",
+                    [(*(facets.get(column) for column in _FACET_COLUMNS), cid) for cid, facets, _ in rows],
+                )
+                cur.execute("DELETE FROM candidate_skills WHERE candidate_id = ANY(%s)", ([cid for cid, _, _ in rows],))
+                self._write_candidate_skills(cur, [(cid, {"skills": skills}) for cid, _, skills in rows])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    # --- candidate_skill_matches maintenance ---
+
+    def skill_catalog_version(self) -> Tuple[Any, ...]:
+        """Cheap fingerprint of skill_vectors; CatalogIndex reloads when it changes."""
+        with self.conn.cursor() as cur:
+            cur.execute(_CATALOG_VERSION_SQL)
+            return tuple(cur.fetchone())
+
+    def get_skill_vectors(self) -> List[Tuple[int, str, np.ndarray]]:
+        """Every catalog skill as (id, name, float32 vector), for the in-process catalog index."""
+        with self.conn.cursor(binary=True) as cur:
+            cur.execute("SELECT id, skill_name, embedding::vector FROM skill_vectors ORDER BY id")
+            return [(row[0], row[1], row[2]) for row in cur.fetchall()]
+
+    def iter_candidate_section_vectors(
+        self, batch_size: int
+    ) -> Iterator[Tuple[List[int], List[int], List[np.ndarray]]]:
+        """
+        Stream every stored section vector as (candidate_ids, section_ids, vectors) batches
+        ordered by candidate, through a server-side cursor so memory stays flat. A
+        candidate's sections always land in a single batch.
+        """
+        with self.conn.cursor(name="candidate_section_vectors", binary=True) as cur:
+            cur.itersize = batch_size
+            cur.execute(
+                """
+                SELECT s.candidate_id, s.id, sv.embedding::vector
+                FROM section_vectors sv
+                JOIN sections s ON s.id = sv.section_id
+                ORDER BY s.candidate_id
+                """
+            )
+            ids: List[int] = []
+            section_ids: List[int] = []
+            vectors: List[np.ndarray] = []
+            while True:
+                rows = cur.fetchmany(batch_size)
+                ids.extend(row[0] for row in rows)
+                section_ids.extend(row[1] for row in rows)
+                vectors.extend(row[2] for row in rows)
+                if not rows:
+                    if ids:
+                        yield ids, section_ids, vectors
+                    return
+                # Hold back the last candidate: the rest of its sections may be in the next fetch
+                cut = len(ids)
+                while cut > 0 and ids[cut - 1] == ids[-1]:
+                    cut -= 1
+                if cut:
+                    yield ids[:cut], section_ids[:cut], vectors[:cut]
+                    ids, section_ids, vectors = ids[cut:], section_ids[cut:], vectors[cut:]
+
+    def replace_skill_matches(
+        self,
+        batches: Iterable[Tuple[List[int], List[int], List[Tuple[int, int, float]]]],
+        skill_ids: Optional[List[int]] = None,
+    ) -> int:
+        """
+        Swap in recomputed matches for the given skills (every skill when None) in one
+        transaction. batches yields (candidate_ids scored, the newest vector-bearing section
+        id seen per candidate, [(candidate_id, skill_id, best_distance)]); each is written with a binary
+        COPY as it arrives, so the caller can score while streaming. Only the scored
+        candidates are touched, so CVs ingested meanwhile keep their rows, and candidates
+        re-extracted since they were read (their sections changed) are skipped: their
+        save already wrote fresh matches. Returns the rows written.
+        """
+        written = skipped = 0
+        try:
+            with self.conn.cursor() as cur:
+                for candidate_ids, seen_section_ids, rows in batches:
+                    # Row locks make in-flight re-extractions (which UPDATE candidates first) finish first
+                    cur.execute("SELECT id FROM candidates WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (candidate_ids,))
+                    cur.execute(
+                        """
+                        SELECT seen.candidate_id
+                        FROM unnest(%s::bigint[], %s::bigint[]) AS seen(candidate_id, section_id)
+                        WHERE seen.section_id IS DISTINCT FROM (
+                            -- Same set the refresh read: blank sections have no vector
+                            SELECT max(s.id)
+                            FROM sections s
+                            JOIN section_vectors sv ON sv.section_id = s.id
+                            WHERE s.candidate_id = seen.candidate_id
+                        )
+                        """,
+                        (candidate_ids, seen_section_ids),
+                    )
+                    changed = {row[0] for row in cur.fetchall()}
+                    if changed:
+                        skipped += len(changed)
+                        candidate_ids = [cid for cid in candidate_ids if cid not in changed]
+                        rows = [row for row in rows if row[0] not in changed]
+
+                    if skill_ids is None:
+                        cur.execute("DELETE FROM candidate_skill_matches WHERE candidate_id = ANY(%s)", (candidate_ids,))
+                    else:
+                        cur.execute(
+                            "DELETE FROM candidate_skill_matches WHERE skill_id = ANY(%s) AND candidate_id = ANY(%s)",
+                            (skill_ids, candidate_ids),
+                        )
+                    if rows:
+                        with cur.copy(
+                            "COPY candidate_skill_matches (candidate_id, skill_id, best_distance) FROM STDIN WITH (FORMAT BINARY)"
+                        ) as copy:
+                            copy.set_types(["int8", "int8", "float8"])
+                            for row in rows:
+                                copy.write_row(row)
+                    written += len(rows)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        log.info(f"Replaced candidate matches: {written} rows ({skipped} re-extracted candidates skipped)")
+        return written
+
+    def refresh_skill_matches(self, skill_ids: List[int]) -> None:
+        """Recompute every candidate's match for the given (new or changed) catalog skills."""
+        if not skill_ids:
+            return
+        with self.conn.cursor() as cur:
+            cur.execute("DELETE FROM candidate_skill_matches WHERE skill_id = ANY(%s)", (skill_ids,))
+            cur.execute(
+                """
+                INSERT INTO candidate_skill_matches (candidate_id, skill_id, best_distance)
+                SELECT s.candidate_id, sk.id, MIN(sv.embedding <=> sk.embedding)
+                FROM skill_vectors sk
+                CROSS JOIN section_vectors sv
+                JOIN sections s ON s.id = sv.section_id
+                WHERE sk.id = ANY(%s)
+                GROUP BY s.candidate_id, sk.id
+                HAVING MIN(sv.embedding <=> sk.embedding) < %s
+                """,
+                (skill_ids, settings.skill_match_threshold),
+            )
+            self.conn.commit()
+        log.info(f"Refreshed candidate matches for {len(skill_ids)} catalog skills")
+
+    def rebuild_candidate_skill_matches(self) -> None:
+        """Full rebuild, e.g. after changing SKILL_MATCH_THRESHOLD."""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT id FROM skill_vectors")
+            skill_ids = [row[0] for row in cur.fetchall()]
+            cur.execute("TRUNCATE candidate_skill_matches")
+            if not skill_ids:
+                self.conn.commit()
+                return
+        self.refresh_skill_matches(skill_ids)
+
+    def upsert_skill_vectors(
+        self, skills: List[Dict[str, str]], vectors: List[np.ndarray], refresh_matches: bool = True
+    ) -> List[int]:
         """
         Inserts or updates skills in the skill_vectors table.
+        Returns the ids of inserted/changed skills. refresh_matches=False leaves their
+        candidate matches to the caller (the in-process CatalogIndex).
         """
         sql = """
             INSERT INTO skill_vectors (skill_name, skill_description, weight, embedding)
-            VALUES (%s, %s, %s, %s)
+            VALUES (%s, %s, %s, %b)
             ON CONFLICT (skill_name)
             DO UPDATE SET 
                 skill_description = EXCLUDED.skill_description,
                 weight = EXCLUDED.weight,
-                embedding = EXCLUDED.embedding;
+                embedding = EXCLUDED.embedding,
+                updated_at = now()
+            WHERE skill_vectors.embedding IS DISTINCT FROM EXCLUDED.embedding
+               OR skill_vectors.weight IS DISTINCT FROM EXCLUDED.weight
+               OR skill_vectors.skill_description IS DISTINCT FROM EXCLUDED.skill_description
+            RETURNING id;
         """
         
         # Prepare data: (name, description, weight, vector)
@@ -170,6 +1449,17 @@ class Repository:
         for s, vector in zip(skills, vectors):
             payload.append((s["name"], s.get("description", ""), s.get("weight", 5), vector))
 
+        # Only rows that were actually inserted/updated come back; unchanged skills are skipped
+        changed_ids: List[int] = []
         with self.conn.cursor() as cur:
-            cur.executemany(sql, payload)
-            self.conn.commit()
\ No newline at end of file
+            cur.executemany(sql, payload, returning=True)
+            while True:
+                changed_ids.extend(row[0] for row in cur.fetchall())
+                if not cur.nextset():
+                    break
+            self.conn.commit()
+
+        # Matches only depend on the embedding, but recomputing a re-weighted skill is cheap enough
+        if refresh_matches:
+            self.refresh_skill_matches(changed_ids)
+        return changed_ids
\ No newline at end of file
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from typing import Any, Dict
 
@@ -47,9 +48,8 @@ Schema compliance:
 - Ensure types match schema exactly.
 """
 
-SKILL_RATING_SYSTEM_PROMPT = """You are a strict skill evidence evaluator. Your task is to produce ONLY the user_skills array in VALID JSON matching the provided SKILL_SCHEMA.
-
-CRITICAL SCORING RULES:
+# Shared by the two-step skill rating prompt and the combined single-call prompt
+SKILL_RATING_RULES = """CRITICAL SCORING RULES:
 - Score system_rating (1–10) ONLY from explicit evidence in the resume.
 - NEVER rate any skill > 3 unless there is explicit WORK EXPERIENCE or PROJECT evidence demonstrating that skill.
 - Keywords alone, self-claimed skill lists, or coursework alone MUST be rated 1–3.
@@ -73,7 +73,11 @@ For each item:
 - system_rating: integer 1–10
 - description: MUST include:
   (a) 1–2 short evidence snippets (work/project context) OR if none: "No work/project evidence found; mentioned only as keyword/self-claim/course."
-  (b) If role-critical and missing evidence: state what evidence would be expected.
+  (b) If role-critical and missing evidence: state what evidence would be expected."""
+
+SKILL_RATING_SYSTEM_PROMPT = f"""You are a strict skill evidence evaluator. Your task is to produce ONLY the user_skills array in VALID JSON matching the provided SKILL_SCHEMA.
+
+{SKILL_RATING_RULES}
 
 Output:
 - Output ONLY valid JSON (the array).
@@ -81,6 +85,15 @@ Output:
 - Do NOT include skills not present in the resume text.
 """
 
+# Single-call mode: extraction + evidence-based skill rating in one response
+COMBINED_SYSTEM_PROMPT = f"""{CV_EXTRACTION_SYSTEM_PROMPT}
+Skill rating (user_skills):
+- Rate every skill in user_skills with the rules below.
+- The "inferred target role" is the user_profile.target_role / industry you extract in this same response.
+
+{SKILL_RATING_RULES}
+"""
+
 # -----------------------------
 # 2) SCHEMAS
 # -----------------------------
@@ -158,6 +171,9 @@ SKILL_SCHEMA: Dict[str, Any] = {
     ]
 }
 
+# CV_SCHEMA with the evidence-rated user_skills items from SKILL_SCHEMA
+COMBINED_SCHEMA: Dict[str, Any] = {**CV_SCHEMA, "user_skills": SKILL_SCHEMA["user_skills"]}
+
 # -----------------------------
 # 3) USER PROMPT TEMPLATES
 # -----------------------------
@@ -206,6 +222,26 @@ CV TEXT:
 \"\"\"
 """
 
+COMBINED_USER_PROMPT_TEMPLATE = """
+Extract data from the following CV text using the SCHEMA below, and rate every skill in user_skills.
+
+Rules:
+- Respect field types exactly.
+- If not found: use null for strings/objects; for booleans use false only when applicable.
+- Address rule: if address_line_1 is null, is_current_address must be null.
+- Infer and fill: user_profile.industry, user_profile.target_role, user_profile.role_confidence, user_profile.about (evidence-based).
+- user_skills: only skills explicitly present in the CV text; never rate >3 without work/project evidence.
+- Return ONLY the JSON object (no markdown).
+
+SCHEMA:
+{schema}
+
+CV TEXT:
+\"\"\"
+{cv_text}
+\"\"\"
+"""
+
 # -----------------------------
 # 4) BUILDERS
 # -----------------------------
@@ -220,6 +256,16 @@ def build_cv_extraction_prompt(cv_text: str) -> str:
     ).strip()
 
 
+def build_combined_extraction_prompt(cv_text: str) -> str:
+    if not cv_text or not cv_text.strip():
+        raise ValueError("cv_text cannot be empty")
+
+    return COMBINED_USER_PROMPT_TEMPLATE.format(
+        schema=json.dumps(COMBINED_SCHEMA, indent=2),
+        cv_text=cv_text.strip(),
+    ).strip()
+
+
 def build_skill_rating_prompt(cv_text: str, extracted_cv_json: Dict[str, Any]) -> str:
     if not cv_text or not cv_text.strip():
         raise ValueError("cv_text cannot be empty")
@@ -242,7 +288,32 @@ def build_skill_rating_prompt(cv_text: str, extracted_cv_json: Dict[str, Any]) -
 
 
 # -----------------------------
-# 5) EXAMPLE USAGE (LLM CALL PSEUDO)
+# 5) PROMPT VERSION
+# -----------------------------
+
+def prompt_fingerprint() -> str:
+    """
+    Short hash over every prompt and schema above. Any edit changes it, which
+    automatically invalidates cached extraction results built with the old prompts.
+    """
+    parts = [
+        CV_EXTRACTION_SYSTEM_PROMPT,
+        SKILL_RATING_SYSTEM_PROMPT,
+        CV_EXTRACTION_USER_PROMPT_TEMPLATE,
+        SKILL_RATING_USER_PROMPT_TEMPLATE,
+        COMBINED_SYSTEM_PROMPT,
+        COMBINED_USER_PROMPT_TEMPLATE,
+        json.dumps(CV_SCHEMA, sort_keys=True),
+        json.dumps(SKILL_SCHEMA, sort_keys=True),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+PROMPT_VERSION = prompt_fingerprint()
+
+
+# -----------------------------
+# 6) EXAMPLE USAGE (LLM CALL PSEUDO)
 # -----------------------------
 """
 # Step 1: Extraction
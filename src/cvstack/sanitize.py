@@ -0,0 +1,43 @@
+from __future__ import annotations
+import re
+from typing import Any, Dict
+
+# Control characters (< 32) other than NUL, which is dropped instead of replaced
+_CONTROL = re.compile(r"[\x01-\x1f]")
+# Same, minus "\n": page text needs its line breaks for header/section detection
+_CONTROL_KEEP_NEWLINES = re.compile(r"[\x01-\x09\x0b-\x1f]")
+
+# Whitespace around a line break, i.e. what a per-line strip() would remove
+_LINE_EDGES = re.compile(r"[^\S\n]*\n[^\S\n]*")
+
+
+def sanitize_text(text: str) -> str:
+    """Remove null bytes and other problematic characters from text"""
+    if not text:
+        return ""
+    return _CONTROL.sub(" ", text.replace("\x00", "")).strip()
+
+
+def sanitize_multiline(text: str) -> str:
+    """Like sanitize_text, but keeps line breaks and strips each line"""
+    if not text:
+        return ""
+    text = text.replace("\x00", "").replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL_KEEP_NEWLINES.sub(" ", text)
+    return _LINE_EDGES.sub("\n", text).strip()
+
+
+def sanitize_value(value: Any) -> Any:
+    """Sanitize every string in a nested dict/list structure in a single walk"""
+    if isinstance(value, str):
+        return sanitize_text(value)
+    if isinstance(value, dict):
+        return {key: sanitize_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [sanitize_value(item) for item in value]
+    return value
+
+
+def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively sanitize all text in a dictionary"""
+    return sanitize_value(data)
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class SearchFilters(BaseModel):
+    """
+    Structured narrowing applied inside the search queries (not to the returned page).
+    Values match the extracted CV fields exactly, e.g. industry="Data Science".
+    """
+    industry: Optional[str] = None            # user_profile.industry
+    target_role: Optional[str] = None         # user_profile.target_role
+    country: Optional[str] = None             # address.country
+    skill: Optional[str] = None               # lists this skill (case-insensitive)
+    min_system_rating: Optional[int] = Field(default=None, ge=1, le=10)  # that skill (or any skill) rated at or above
+    currently_working: Optional[bool] = None  # any experience entry with currently_working
+    topics: Optional[List[str]] = None        # only match these section topics, e.g. ["experience", "projects"]
+
+    def is_empty(self) -> bool:
+        return all(v is None for v in self.model_dump().values())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+import argparse
+
+from cvstack.db.repository import Repository
+from cvstack.services.facets import extract_facets, extract_skills
+
+def main() -> None:
+    """
+    Fill the candidates facet columns and candidate_skills (migration 0011) from the
+    stored section payloads, using the same extraction as ingest. Safe to re-run.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="candidates per transaction")
+    args = parser.parse_args()
+
+    repo = Repository()
+    try:
+        candidates = skills = 0
+        for batch in repo.iter_candidate_facet_sources(args.batch_size):
+            rows = [(cid, extract_facets(parsed), extract_skills(parsed)) for cid, parsed in batch.items()]
+            repo.write_candidate_facets(rows)
+            candidates += len(rows)
+            skills += sum(len(r[2]) for r in rows)
+            print(f"{candidates} candidates, {skills} skills backfilled")
+    finally:
+        repo.close()
+
+if __name__ == "__main__":
+    main()
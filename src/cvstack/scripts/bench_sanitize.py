@@ -0,0 +1,85 @@
+from __future__ import annotations
+import argparse
+import random
+import string
+import timeit
+from typing import Any, Dict
+
+from cvstack.sanitize import sanitize_dict, sanitize_text
+
+
+def legacy_sanitize_text(text: str) -> str:
+    # The previous char-by-char implementation, kept here as the baseline
+    if not text:
+        return ""
+    cleaned = text.replace("\x00", "")
+    cleaned = "".join(char if ord(char) >= 32 else " " for char in cleaned)
+    return cleaned.strip()
+
+
+def legacy_sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    result = {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            result[key] = legacy_sanitize_text(value)
+        elif isinstance(value, dict):
+            result[key] = legacy_sanitize_dict(value)
+        elif isinstance(value, list):
+            result[key] = [
+                legacy_sanitize_dict(item) if isinstance(item, dict)
+                else legacy_sanitize_text(item) if isinstance(item, str)
+                else item
+                for item in value
+            ]
+        else:
+            result[key] = value
+    return result
+
+
+def make_text(chars: int, rng: random.Random) -> str:
+    # Mostly prose with the odd NUL / control character / non-ASCII char, like pypdf output
+    alphabet = string.ascii_letters + string.digits + "     .,;-" + "éüß–•"
+    noise = "\x00\x01\x07\t\n\x0c\x1f"
+    return "".join(rng.choice(noise) if rng.random() < 0.01 else rng.choice(alphabet) for _ in range(chars))
+
+
+def make_parsed(chars: int, rng: random.Random) -> Dict[str, Any]:
+    # Shaped like an extractor result: a few large free-text fields and many small ones
+    chunk = max(1, chars // 40)
+    return {
+        "user_profile": {"first_name": make_text(8, rng), "last_name": make_text(10, rng), "email": make_text(20, rng)},
+        "experience": [
+            {"role": make_text(30, rng), "company": make_text(20, rng), "summary": make_text(chunk, rng)}
+            for _ in range(20)
+        ],
+        "projects": [{"title": make_text(30, rng), "summary": make_text(chunk, rng)} for _ in range(20)],
+        "user_skills": [
+            {"skill": make_text(15, rng), "level_of_skill": "Advanced", "system_rating": rng.randint(1, 10)}
+            for _ in range(60)
+        ],
+    }
+
+
+def bench(label: str, old, new, arg, repeat: int) -> None:
+    assert old(arg) == new(arg), f"{label}: outputs differ"
+    t_old = min(timeit.repeat(lambda: old(arg), number=1, repeat=repeat))
+    t_new = min(timeit.repeat(lambda: new(arg), number=1, repeat=repeat))
+    print(f"{label:<30} legacy={t_old * 1000:8.2f}ms  new={t_new * 1000:8.2f}ms  speedup={t_old / t_new:6.1f}x")
+
+
+def main() -> None:
+    """Compare the shared sanitize helpers against the old char-by-char versions on large CVs."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--chars", type=int, nargs="+", default=[10_000, 200_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for chars in args.chars:
+        bench(f"sanitize_text {chars:,} chars", legacy_sanitize_text, sanitize_text, make_text(chars, rng), args.repeat)
+    for chars in args.chars:
+        bench(f"sanitize_dict {chars:,} chars", legacy_sanitize_dict, sanitize_dict, make_parsed(chars, rng), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
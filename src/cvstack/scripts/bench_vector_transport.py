@@ -0,0 +1,45 @@
+from __future__ import annotations
+import argparse
+import timeit
+
+import numpy as np
+from pgvector.utils import Vector
+
+
+def main() -> None:
+    """
+    Compare pgvector's text and binary wire formats for a re-embedding sized batch:
+    bytes sent plus client-side encode/decode time (no database needed).
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--vectors", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = [v for v in rng.standard_normal((args.vectors, args.dim)).astype(np.float32)]
+    as_lists = [v.tolist() for v in vectors]  # what the embedder used to return
+
+    text = [Vector(v).to_text() for v in as_lists]
+    binary = [Vector(v).to_binary() for v in vectors]
+    assert all(np.array_equal(Vector.from_binary(b).to_numpy(), v) for b, v in zip(binary[:100], vectors))
+
+    def timed(fn) -> float:
+        return min(timeit.repeat(fn, number=1, repeat=args.repeat)) * 1000
+
+    rows = [
+        ("text", sum(len(t) for t in text), timed(lambda: [Vector(v).to_text() for v in as_lists]),
+         timed(lambda: [Vector.from_text(t).to_numpy() for t in text])),
+        ("binary", sum(len(b) for b in binary), timed(lambda: [Vector(v).to_binary() for v in vectors]),
+         timed(lambda: [Vector.from_binary(b).to_numpy() for b in binary])),
+    ]
+    print(f"{args.vectors:,} vectors x {args.dim} dims")
+    for name, size, encode_ms, decode_ms in rows:
+        print(f"  {name:<7} wire={size / 1e6:8.1f} MB  encode={encode_ms:8.1f}ms  decode={decode_ms:8.1f}ms")
+    (_, t_size, t_enc, t_dec), (_, b_size, b_enc, b_dec) = rows
+    print(f"  binary saves {1 - b_size / t_size:.0%} of the bytes, encode {t_enc / b_enc:.1f}x, decode {t_dec / b_dec:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
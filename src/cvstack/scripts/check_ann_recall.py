@@ -0,0 +1,59 @@
+from __future__ import annotations
+import argparse
+import time
+from typing import List
+
+from cvstack.db.repository import Repository
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+def main() -> None:
+    """
+    Recall-vs-exact check for the section ANN index.
+    Samples stored section vectors as queries, runs the exact (seq scan) ranking as
+    ground truth, then reports recall@k and latency for each ef_search / probes value.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--queries", type=int, default=50, help="number of sampled query vectors")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--ef-search", type=_parse_ints, default=[20, 40, 80, 160, 320])
+    parser.add_argument("--probes", type=_parse_ints, default=[1, 5, 10, 20, 50])
+    parser.add_argument("--rebuild", choices=["hnsw", "ivfflat"], help="rebuild the cosine indexes first")
+    args = parser.parse_args()
+
+    repo = Repository()
+    try:
+        if args.rebuild:
+            repo.rebuild_vector_indexes(args.rebuild)
+
+        with repo.conn.cursor(binary=True) as cur:
+            cur.execute("SELECT embedding::vector FROM section_vectors ORDER BY random() LIMIT %s", (args.queries,))
+            queries = [row[0] for row in cur.fetchall()]
+        if not queries:
+            print("section_vectors is empty, nothing to measure")
+            return
+
+        truth = []
+        started = time.perf_counter()
+        for q in queries:
+            truth.append({sid for sid, _ in repo.nearest_sections(q, args.k, exact=True)})
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        print(f"exact: {exact_ms:.1f} ms/query over {len(queries)} queries, k={args.k}")
+
+        # Both knobs are always set; only the one matching the built index has an effect
+        for name, values in (("ef_search", args.ef_search), ("probes", args.probes)):
+            for value in values:
+                hits = 0
+                started = time.perf_counter()
+                for q, expected in zip(queries, truth):
+                    found = repo.nearest_sections(q, args.k, **{name: value})
+                    hits += len(expected & {sid for sid, _ in found})
+                elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+                recall = hits / max(1, sum(len(t) for t in truth))
+                print(f"{name}={value:<5} recall@{args.k}={recall:.3f}  {elapsed_ms:.1f} ms/query")
+    finally:
+        repo.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+from cvstack.services.extractor import CVExtractor
+from cvstack.services.ingest import IngestPipeline
+
+def main() -> None:
+    """
+    Run the two-step and combined extraction modes on the same CVs (cache disabled)
+    and report LLM calls, tokens and latency per CV plus the overall savings.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("files", nargs="+", type=Path, help="PDF or text CVs")
+    args = parser.parse_args()
+
+    extractor = CVExtractor(use_cache=False)
+    totals = {mode: {"prompt_tokens": 0, "output_tokens": 0, "latency_ms": 0.0} for mode in ("two_step", "combined")}
+    fallbacks = 0
+
+    for path in args.files:
+        text = IngestPipeline.extract_text(path.name, path.read_bytes())
+        print(f"\n{path.name} ({len(text)} chars)")
+        for mode in ("two_step", "combined"):
+            _, m = extractor.extract_with_metrics(text, mode=mode)
+            fallbacks += int(m["fallback"])
+            for key in totals[mode]:
+                totals[mode][key] += m[key]
+            print(
+                f"  {mode:<9} calls={m['calls']} prompt_tokens={m['prompt_tokens']} "
+                f"output_tokens={m['output_tokens']} latency={m['latency_ms']:.0f}ms"
+                + ("  (fell back to two_step)" if m["fallback"] else "")
+            )
+
+    two, one = totals["two_step"], totals["combined"]
+    print(f"\nTotals over {len(args.files)} CVs (combined fallbacks: {fallbacks})")
+    for key in ("prompt_tokens", "output_tokens", "latency_ms"):
+        saved = 1 - one[key] / two[key] if two[key] else 0.0
+        print(f"  {key:<14} two_step={two[key]:.0f} combined={one[key]:.0f} saving={saved:.0%}")
+
+if __name__ == "__main__":
+    main()
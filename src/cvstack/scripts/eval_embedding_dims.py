@@ -0,0 +1,86 @@
+from __future__ import annotations
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from cvstack.db.repository import Repository
+from cvstack.services.embedder import Embedder
+from cvstack.services.embedding_cache import EmbeddingCache
+
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _normalized(vectors: List[np.ndarray]) -> np.ndarray:
+    matrix = np.vstack(vectors)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def main() -> None:
+    """
+    Ranking quality per embedding dimension. Catalog skills are the queries and a
+    sample of stored sections the corpus; both are embedded at every size through
+    the API (output_dimensionality). Reports recall@k and nDCG@k of each size against
+    the largest one, plus bytes per vector and the time of one brute-force scoring pass.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--dims", type=_parse_ints, default=[768, 384, 256, 128])
+    parser.add_argument("--sections", type=int, default=2000, help="sampled sections (corpus)")
+    parser.add_argument("--queries", type=int, default=100, help="sampled catalog skills (queries)")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    repo = Repository()
+    try:
+        with repo.conn.cursor() as cur:
+            cur.execute(
+                "SELECT text_for_embedding FROM sections WHERE coalesce(text_for_embedding, '') <> '' "
+                "ORDER BY random() LIMIT %s",
+                (args.sections,),
+            )
+            corpus = [row[0] for row in cur.fetchall()]
+            cur.execute(
+                "SELECT skill_name || ': ' || coalesce(skill_description, '') FROM skill_vectors ORDER BY random() LIMIT %s",
+                (args.queries,),
+            )
+            queries = [row[0] for row in cur.fetchall()]
+    finally:
+        repo.close()
+    if not corpus or not queries:
+        print("Need stored sections and a loaded skill catalog to evaluate")
+        return
+
+    dims = sorted(set(args.dims), reverse=True)
+    k = min(args.k, len(corpus))
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    reference = None
+    print(f"{len(queries)} queries x {len(corpus)} sections, k={k}, reference={dims[0]} dims")
+
+    for dim in dims:
+        # In-memory cache only, so the eval neither reads nor fills the shared DB cache
+        embedder = Embedder(cache=EmbeddingCache(use_db=False), dimensions=dim)
+        docs = _normalized(embedder.embed(corpus))
+        qs = _normalized(embedder.embed(queries, task_type="retrieval_query"))
+
+        started = time.perf_counter()
+        scores = qs @ docs.T
+        scoring_ms = (time.perf_counter() - started) * 1000
+        ranking = np.argsort(-scores, axis=1)[:, :k]
+
+        if reference is None:
+            reference = ranking
+            gains = {(qi, doc): discounts[rank] for qi, row in enumerate(ranking) for rank, doc in enumerate(row)}
+        recall = np.mean([len(set(row) & set(ref)) / k for row, ref in zip(ranking, reference)])
+        ndcg = np.mean([
+            sum(gains.get((qi, doc), 0.0) * discounts[rank] for rank, doc in enumerate(row)) / float(discounts @ discounts)
+            for qi, row in enumerate(ranking)
+        ])
+        print(f"  dim={dim:<5} bytes/vector={dim * 4:<6} recall@{k}={recall:.3f}  nDCG@{k}={ndcg:.3f}  "
+              f"scoring={scoring_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
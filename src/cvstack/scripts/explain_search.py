@@ -0,0 +1,49 @@
+from __future__ import annotations
+import argparse
+import sys
+
+from cvstack.db.repository import Repository
+from cvstack.schemas.search import SearchFilters
+
+def main() -> None:
+    """
+    Plan check for /search and /search/catalog/skill.
+    EXPLAINs the candidate search for a sampled stored vector and fails unless, with
+    sequential scans disabled, the nearest-section step is an index scan on section_vectors
+    (i.e. the ORDER BY ... LIMIT is one the ANN index can serve).
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--skill", help="use this catalog skill's vector instead of a sampled section")
+    parser.add_argument("--filters", type=SearchFilters.model_validate_json, default=None,
+                        help='SearchFilters as JSON, e.g. \'{"country": "Sri Lanka", "min_system_rating": 7}\'')
+    args = parser.parse_args()
+
+    repo = Repository()
+    try:
+        if args.skill:
+            query = repo.get_skill_vector(args.skill)
+        else:
+            with repo.conn.cursor(binary=True) as cur:
+                cur.execute("SELECT embedding::vector FROM section_vectors ORDER BY random() LIMIT 1")
+                row = cur.fetchone()
+            query = row[0] if row else None
+        if query is None:
+            print("no query vector available (empty section_vectors or unknown skill)")
+            sys.exit(1)
+
+        print("--- planner default ---")
+        print("\n".join(repo.explain_candidate_search(query, args.limit, filters=args.filters)))
+        forced = repo.explain_candidate_search(query, args.limit, seqscan=False, filters=args.filters)
+        print("--- enable_seqscan=off ---")
+        print("\n".join(forced))
+
+        if not any("Index Scan" in line and "section_vectors" in line for line in forced):
+            print("FAIL: nearest-section query is not served by the ANN index")
+            sys.exit(1)
+        print("OK: nearest-section query is served by the ANN index")
+    finally:
+        repo.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import json
 from pathlib import Path
 
 from cvstack.db.repository import Repository
+from cvstack.services.catalog_index import CatalogIndex
 from cvstack.services.embedder import Embedder
 
 DATA_FILE = Path(__file__).resolve().parents[2] / "cvstack"/ "data" / "skill_catalog.json"
@@ -13,12 +14,18 @@ def main() -> None:
 
     embedder = Embedder()
     vectors = embedder.embed(texts)
-    if not vectors:
+    embedded = [(skill, vec) for skill, vec in zip(skills, vectors) if vec is not None]
+    if not embedded:
         raise RuntimeError("No vectors generated")
+    skills = [skill for skill, _ in embedded]
+    vectors = [vec for _, vec in embedded]
 
     repo = Repository()
     try:
-        repo.upsert_skill_vectors(skills, vectors)
+        changed_ids = repo.upsert_skill_vectors(skills, vectors, refresh_matches=False)
+        catalog = CatalogIndex()
+        catalog.load(repo)
+        catalog.refresh_matches(repo, changed_ids)
     finally:
         repo.close()
 
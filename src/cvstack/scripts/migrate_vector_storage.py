@@ -0,0 +1,52 @@
+from __future__ import annotations
+import argparse
+from typing import Dict
+
+from cvstack.db.repository import VECTOR_STORAGES, Repository
+
+
+def _print_sizes(label: str, sizes: Dict[str, Dict[str, int]]) -> None:
+    print(label)
+    for table, size in sorted(sizes.items()):
+        print(f"  {table:<16} heap={size['heap_bytes'] / 2**20:9.1f} MB  indexes={size['index_bytes'] / 2**20:9.1f} MB")
+
+
+def main() -> None:
+    """
+    Switch section_vectors / skill_vectors to another VECTOR_STORAGE mode in place.
+    Reports heap/index sizes before and after, and recall@k of the new ANN search
+    against the exact ranking taken before the conversion. Set VECTOR_STORAGE to the
+    same mode afterwards so the app queries the new layout.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("storage", choices=VECTOR_STORAGES)
+    parser.add_argument("--method", choices=["hnsw", "ivfflat"], help="index method (default VECTOR_INDEX_METHOD)")
+    parser.add_argument("--queries", type=int, default=50, help="sampled query vectors for the recall check")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    repo = Repository()
+    try:
+        _print_sizes(f"before ({repo.vector_storage}):", repo.vector_storage_sizes())
+
+        # Ground truth is the exact ranking over the stored vectors as they are now
+        with repo.conn.cursor(binary=True) as cur:
+            cur.execute("SELECT embedding::vector FROM section_vectors ORDER BY random() LIMIT %s", (args.queries,))
+            queries = [row[0] for row in cur.fetchall()]
+        truth = [{sid for sid, _ in repo.nearest_sections(q, args.k, exact=True)} for q in queries]
+
+        repo.migrate_vector_storage(args.storage, method=args.method)
+        _print_sizes(f"after ({args.storage}):", repo.vector_storage_sizes())
+
+        if queries:
+            hits = sum(len(expected & {sid for sid, _ in repo.nearest_sections(q, args.k)})
+                       for q, expected in zip(queries, truth))
+            recall = hits / max(1, sum(len(t) for t in truth))
+            print(f"recall@{args.k} vs the pre-migration exact ranking: {recall:.3f} over {len(queries)} queries")
+        print(f"Now set VECTOR_STORAGE={args.storage} and restart the API / workers.")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from cvstack.db.repository import Repository
+from cvstack.services.catalog_index import CatalogIndex
+
+def main() -> None:
+    """Recompute candidate_skill_matches from scratch (e.g. after changing SKILL_MATCH_THRESHOLD)."""
+    repo = Repository()
+    try:
+        # Scored in-process against the catalog matrix; repo.rebuild_candidate_skill_matches() is the SQL equivalent
+        catalog = CatalogIndex()
+        catalog.load(repo)
+        catalog.refresh_matches(repo)
+    finally:
+        repo.close()
+
+if __name__ == "__main__":
+    main()
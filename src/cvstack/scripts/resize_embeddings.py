@@ -0,0 +1,31 @@
+from __future__ import annotations
+import argparse
+
+from cvstack.db.repository import Repository
+
+
+def main() -> None:
+    """
+    Shrink stored section/skill vectors to a smaller embedding dimension in place
+    (truncation, which is how text-embedding-004 produces reduced sizes), then rebuild
+    the ANN indexes and catalog matches. Set EMBEDDING_DIM to the same value afterwards;
+    the API refuses to start while the two disagree.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("dim", type=int, help="new dimension, e.g. 256 or 384")
+    parser.add_argument("--method", choices=["hnsw", "ivfflat"], help="index method (default VECTOR_INDEX_METHOD)")
+    args = parser.parse_args()
+
+    repo = Repository()
+    try:
+        before = repo.vector_columns()
+        repo.resize_vector_columns(args.dim, method=args.method)
+        for table, (type_name, dim) in sorted(repo.vector_columns().items()):
+            print(f"{table}: {type_name}({before[table][1]}) -> {type_name}({dim})")
+        print(f"Now set EMBEDDING_DIM={args.dim} and restart the API / workers.")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from ..db.repository import pooled_repository
+from .ingest import IngestPipeline
+
+log = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = (".pdf", ".txt")
+BATCH_SIZE = 100  # files hashed and checked against the DB per round trip
+SAVE_BATCH_SIZE = 50  # extracted CVs written per pipelined transaction
+
+
+def iter_sources(path: Path) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """
+    Yield (name, loader) for every PDF/text file in a directory (recursive) or ZIP archive.
+    Loaders read lazily, so a 50k-file archive is never held in memory at once; a ZIP's
+    loaders only work until the iteration finishes (the archive is closed then).
+    """
+    if path.is_dir():
+        for f in sorted(path.rglob("*")):
+            if f.is_file() and f.suffix.lower() in SUPPORTED_SUFFIXES:
+                yield str(f.relative_to(path)), f.read_bytes
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and Path(info.filename).suffix.lower() in SUPPORTED_SUFFIXES:
+                    yield info.filename, (lambda name=info.filename: archive.read(name))
+    else:
+        raise ValueError(f"{path} is neither a directory nor a ZIP archive")
+
+
+class BulkIngest:
+    """
+    Ingest a directory or ZIP of CVs.
+    PDF parsing (CPU bound) runs on the shared PDF process pool with the same
+    PDF_MAX_PAGES / PDF_TIMEOUT guards as single uploads; LLM extraction, embedding and
+    DB writes (I/O bound) run in a thread pool sharing one IngestPipeline and the DB pool.
+    Extracted CVs are buffered and written SAVE_BATCH_SIZE at a time in one
+    pipelined transaction (Repository.save_parsed_cvs).
+    Files whose content hash is already on a candidate are skipped, so a crashed
+    run can simply be started again.
+    """
+
+    def __init__(
+        self,
+        threads: Optional[int] = None,
+        pipeline: Optional[IngestPipeline] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        self.threads = threads or settings.bulk_ingest_threads
+        self.pipeline = pipeline if pipeline is not None else IngestPipeline()
+        self.progress = progress
+        self.stats: Dict[str, Any] = {"total": 0, "done": 0, "skipped": 0, "failed": 0, "errors": []}
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+
+    def run(self, path: Path) -> Dict[str, Any]:
+        # Count first (names only), then read while the archive is still open
+        self.stats["total"] = sum(1 for _ in iter_sources(path))
+        log.info(f"[BULK] {self.stats['total']} files found in {path}")
+        sources = iter_sources(path)
+        started = time.perf_counter()
+
+        # Bound the number of files in flight so memory stays flat on large archives
+        in_flight = threading.BoundedSemaphore(self.threads * 2)
+        futures: List[Future] = []
+
+        with ThreadPoolExecutor(max_workers=self.threads) as workers:
+            while True:
+                chunk = []
+                for name, load in islice(sources, BATCH_SIZE):
+                    content = load()
+                    chunk.append((name, content, IngestPipeline.source_hash(content)))
+                if not chunk:
+                    break
+
+                with pooled_repository() as repo:
+                    existing = repo.find_candidates_by_source_hash([h for _, _, h in chunk])
+
+                for name, content, source_hash in chunk:
+                    if source_hash in existing:
+                        self._record("skipped", name)
+                        continue
+                    in_flight.acquire()
+                    futures.append(workers.submit(self._process, name, content, source_hash, in_flight))
+
+            for f in futures:
+                f.result()
+        self._flush(force=True)
+
+        self.stats["elapsed_s"] = round(time.perf_counter() - started, 1)
+        log.info(f"[BULK] finished: {self._summary()} in {self.stats['elapsed_s']}s")
+        return self.stats
+
+    def _process(self, name: str, content: bytes, source_hash: str, in_flight: threading.BoundedSemaphore) -> None:
+        try:
+            text = IngestPipeline.extract_text_from_bytes(name, content)
+            prepared = self.pipeline.prepare(text, source_hash=source_hash)
+        except Exception as e:
+            self._record("failed", name, str(e))
+            return
+        finally:
+            in_flight.release()
+
+        if prepared["duplicate"]:
+            self._record("done", name)
+            return
+        with self._lock:
+            self._pending.append((name, prepared))
+        self._flush()
+
+    def _flush(self, force: bool = False) -> None:
+        with self._lock:
+            if not self._pending or (len(self._pending) < SAVE_BATCH_SIZE and not force):
+                return
+            batch, self._pending = self._pending, []
+
+        try:
+            with pooled_repository() as repo:
+                repo.save_parsed_cvs([prepared["cv"] for _, prepared in batch])
+        except Exception as e:
+            # One bad record aborts the whole batch; retry one by one so only it fails
+            log.warning(f"[BULK] batch save of {len(batch)} CVs failed ({e}), saving individually")
+            for name, prepared in batch:
+                try:
+                    with pooled_repository() as repo:
+                        repo.save_parsed_cv(prepared["cv"])
+                    self._record("done", name)
+                except Exception as item_err:
+                    self._record("failed", name, str(item_err))
+            return
+        for name, _ in batch:
+            self._record("done", name)
+
+    def _record(self, outcome: str, name: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+            if error:
+                self.stats["errors"].append({"file": name, "error": error})
+                log.error(f"[BULK] {name} failed: {error}")
+            snapshot = {k: v for k, v in self.stats.items() if k != "errors"}
+        processed = snapshot["done"] + snapshot["skipped"] + snapshot["failed"]
+        log.info(f"[BULK] [{processed}/{snapshot['total']}] {outcome}: {name}")
+        if self.progress:
+            self.progress(snapshot)
+
+    def _summary(self) -> str:
+        s = self.stats
+        return f"{s['done']} ingested, {s['skipped']} skipped, {s['failed']} failed of {s['total']}"
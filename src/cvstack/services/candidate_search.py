@@ -1,16 +1,63 @@
 from __future__ import annotations
+import base64
+import bisect
+import json
 import logging
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from ..db.repository import Repository
+from ..config import settings
+from ..db.repository import FACET_NAMES, Repository
+from ..schemas.search import SearchFilters
+from ..services.catalog_index import CatalogIndex, get_catalog_index
 from ..services.embedder import Embedder
+from ..services.search_cache import SearchCache, get_facet_cache, get_ranking_cache
 
 log = logging.getLogger(__name__)
 
+
+def encode_cursor(hit: Dict[str, Any]) -> str:
+    """Opaque page cursor: the (score, candidate_id) of the last result shown."""
+    raw = json.dumps([hit["score"], hit["candidate_id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, candidate_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(score), int(candidate_id)
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+
+
+def _rank_key(hit: Dict[str, Any]) -> Tuple[float, int]:
+    # Score descending, candidate id ascending: a total order, so pages never overlap or skip
+    return -hit["score"], hit["candidate_id"]
+
+
+def _page(
+    ranked: List[Dict[str, Any]], limit: int, after: Optional[Tuple[float, int]]
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """The `limit` hits following the `after` cursor position, and whether any follow them."""
+    start = 0
+    if after is not None:
+        start = bisect.bisect_right([_rank_key(h) for h in ranked], (-after[0], after[1]))
+    return ranked[start:start + limit], start + limit < len(ranked)
+
 class SearchService:
-    def __init__(self) -> None:
-        self.repo = Repository()
-        self.embedder = Embedder()
+    def __init__(
+        self,
+        repo: Optional[Repository] = None,
+        embedder: Optional[Embedder] = None,
+        catalog: Optional[CatalogIndex] = None,
+        facet_cache: Optional[SearchCache] = None,
+    ) -> None:
+        # The API hands in a pooled Repository per request; scripts fall back to a direct connection
+        self.repo = repo if repo is not None else Repository()
+        self.embedder = embedder if embedder is not None else Embedder()
+        self.catalog = catalog if catalog is not None else get_catalog_index()
+        self.facet_cache = facet_cache if facet_cache is not None else get_facet_cache()
+        self.ranking_cache = get_ranking_cache()
 
     def index_catalog(self, catalog_data: Any) -> None:
         """
@@ -80,27 +127,255 @@ class SearchService:
             return
 
         log.info(f"Generating embeddings for {len(flat_skills)} skills...")
-        vectors = self.embedder.embed(texts_to_embed)
+        vectors = self.embedder.embed(texts_to_embed, repo=self.repo)
 
-        if not vectors:
+        # Keep skills and vectors aligned, dropping any skill whose text was blank
+        embedded = [(skill, vec) for skill, vec in zip(flat_skills, vectors) if vec is not None]
+        if not embedded:
             log.warning("No vectors generated. Skipping DB save.")
             return
+        flat_skills = [skill for skill, _ in embedded]
+        vectors = [vec for _, vec in embedded]
 
         log.info(f"Saving {len(flat_skills)} skill vectors to database...")
-        self.repo.upsert_skill_vectors(flat_skills, vectors)
+        changed_ids = self.repo.upsert_skill_vectors(flat_skills, vectors, refresh_matches=False)
+
+        # Reload the in-memory catalog and rescore every candidate against the changed skills
+        self.catalog.load(self.repo)
+        self.catalog.refresh_matches(self.repo, changed_ids)
+        self.ranking_cache.clear()
 
-    def search(self, skill_text: str, top_k: int = 50) -> List[Dict[str, Any]]:
-        """Search using free-text skill query (embeds the query first)."""
+    def search(
+        self,
+        skill_text: str,
+        top_k: int = 50,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search using free-text skill query (embeds the query first).
+        ef_search / probes trade recall for latency on the HNSW / IVFFlat index
+        (defaults come from Settings). filters narrow inside the index scan, so the
+        top_k returned are the top_k matching ones.
+        """
         if not skill_text or not skill_text.strip():
             return []
         
         # Embed the single query string
-        vectors = self.embedder.embed([skill_text])
-        if not vectors:
+        vectors = self.embedder.embed([skill_text], repo=self.repo)
+        if not vectors or vectors[0] is None:
             return []
             
         query_vector = vectors[0]
-        return self.repo.search_by_skill(query_vector, limit=top_k)
+        return self.repo.search_by_skill(query_vector, limit=top_k, ef_search=ef_search, probes=probes, filters=filters)
+
+    def search_page(
+        self,
+        query: str,
+        mode: str = "vector",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of /search. The ranked list (top SEARCH_RANKED_DEPTH) is computed on the
+        first request and cached for RANKING_CACHE_TTL seconds; later pages only slice it
+        at the cursor. Cursors are keyset positions, so an expired list is simply recomputed.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        depth = max(limit, settings.search_ranked_depth)
+        # depth is part of the key: a list ranked for a smaller page size is too short for a larger one
+        key = ("search", mode, (query or "").strip(), ef_search, probes, depth,
+               filters.model_dump_json() if filters is not None else None)
+        ranked = self.ranking_cache.get(key)
+        timings: Optional[Dict[str, Any]] = None
+        if ranked is None:
+            if mode == "hybrid":
+                response = self.search_hybrid(query, depth, ef_search=ef_search, probes=probes, filters=filters)
+                ranked, timings = response["results"], response["timings"]
+            elif mode == "lexical":
+                ranked = self.search_text(query, depth, filters=filters)
+            else:
+                ranked = self.search(query, depth, ef_search=ef_search, probes=probes, filters=filters)
+            ranked = sorted(ranked, key=_rank_key)
+            self.ranking_cache.put(key, ranked)
+
+        page, more = _page(ranked, limit, after)
+        response = {"results": page, "next_cursor": encode_cursor(page[-1]) if more and page else None}
+        if timings is not None:
+            response["timings"] = timings
+        return response
+
+    def search_text(self, query: str, top_k: int = 50, filters: Optional[SearchFilters] = None) -> List[Dict[str, Any]]:
+        """Lexical-only search over the full-text indexes (exact terms, no embedding call)."""
+        if not query or not query.strip():
+            return []
+        return self.repo.search_by_text(query, limit=top_k, filters=filters)
+
+    def search_hybrid(
+        self,
+        query: str,
+        top_k: int = 50,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> Dict[str, Any]:
+        """
+        Lexical + vector search merged with reciprocal-rank fusion.
+        The Gemini query embedding (network-bound) runs on a background thread while the
+        lexical arm runs on this request's connection; the ANN arm follows on the same
+        connection. The response carries per-arm timings for tuning.
+        """
+        if not query or not query.strip():
+            return {"results": [], "timings": {}}
+        started = time.perf_counter()
+        arm_limit = max(top_k, settings.hybrid_arm_limit)
+
+        def lexical_arm() -> Tuple[List[Dict[str, Any]], float]:
+            arm_started = time.perf_counter()
+            hits = self.repo.search_by_text(query, limit=arm_limit, filters=filters)
+            return hits, (time.perf_counter() - arm_started) * 1000
+
+        vectors, (lexical_hits, lexical_ms) = self.embedder.embed_alongside([query], lexical_arm, repo=self.repo)
+        embed_ms = (time.perf_counter() - started) * 1000
+
+        vector_hits: List[Dict[str, Any]] = []
+        if vectors and vectors[0] is not None:
+            vector_hits = self.repo.search_by_skill(
+                vectors[0], limit=arm_limit, ef_search=ef_search, probes=probes, filters=filters
+            )
+        vector_ms = (time.perf_counter() - started) * 1000
+
+        fusion_started = time.perf_counter()
+        results = self.fuse([("lexical", lexical_hits), ("vector", vector_hits)], top_k)
+        fusion_ms = (time.perf_counter() - fusion_started) * 1000
+
+        return {
+            "results": results,
+            "timings": {
+                "lexical_ms": round(lexical_ms, 1),
+                "embed_ms": round(embed_ms, 1),  # runs alongside the lexical arm
+                "vector_ms": round(vector_ms, 1),  # includes embed_ms
+                "fusion_ms": round(fusion_ms, 2),
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+            "arm_hits": {"lexical": len(lexical_hits), "vector": len(vector_hits)},
+        }
+
+    def search_facets(
+        self,
+        query: Optional[str] = None,
+        skill: Optional[str] = None,
+        mode: str = "vector",
+        top_k: int = 50,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> Dict[str, Any]:
+        """
+        A search page plus facet counts (industry, country, target role, currently working,
+        skill level, top skills) over the candidates it matched: the top FACET_CANDIDATES of
+        the text or catalog-skill search, or every candidate passing filters when neither is
+        given. Cached per (query, skill, mode, filters, top_k) for FACET_CACHE_TTL seconds.
+        """
+        key = (
+            (query or "").strip(), skill, mode, top_k, ef_search, probes,
+            filters.model_dump_json() if filters is not None else None,
+        )
+        cached = self.facet_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        started = time.perf_counter()
+        match_limit = max(top_k, settings.facet_candidates)
+        hits: Optional[List[Dict[str, Any]]] = None
+        if skill:
+            hits = self.search_by_catalog_skill(skill, match_limit, filters=filters)
+        elif key[0]:
+            if mode == "hybrid":
+                hits = self.search_hybrid(query, match_limit, ef_search=ef_search, probes=probes, filters=filters)["results"]
+            elif mode == "lexical":
+                hits = self.search_text(query, match_limit, filters=filters)
+            else:
+                hits = self.search(query, match_limit, ef_search=ef_search, probes=probes, filters=filters)
+
+        if hits is None:
+            facets = self.repo.candidate_facets(filters=filters)
+        elif hits:
+            facets = self.repo.candidate_facets([h["candidate_id"] for h in hits], filters=filters)
+        else:
+            facets = {name: [] for name in FACET_NAMES}
+
+        page = hits[:top_k] if hits is not None else []
+        response = {
+            "count": len(page),
+            "results": page,
+            "matched": len(hits) if hits is not None else None,
+            "facets": facets,
+            "took_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        self.facet_cache.put(key, response)
+        return {**response, "cached": False}
+
+    @staticmethod
+    def fuse(arms: List[Tuple[str, List[Dict[str, Any]]]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion: each candidate scores sum(1 / (HYBRID_RRF_K + rank)) over
+        the arms that returned it. Display fields come from the arm that ranked it highest.
+        """
+        k = settings.hybrid_rrf_k
+        fused: Dict[int, Dict[str, Any]] = {}
+        for arm, hits in arms:
+            for rank, hit in enumerate(hits, start=1):
+                entry = fused.get(hit["candidate_id"])
+                if entry is None:
+                    entry = fused[hit["candidate_id"]] = {**hit, "rrf_score": 0.0, "best_rank": rank}
+                else:
+                    better = rank < entry["best_rank"]
+                    for key, value in hit.items():
+                        if key not in entry or (better and value is not None):
+                            entry[key] = value
+                    if better:
+                        entry["best_rank"] = rank
+                entry[f"{arm}_rank"] = rank
+                entry["rrf_score"] += 1.0 / (k + rank)
+
+        results = sorted(fused.values(), key=lambda e: (-e["rrf_score"], e["candidate_id"]))[:top_k]
+        for entry in results:
+            del entry["best_rank"]
+            entry["score"] = entry["rrf_score"]
+            entry["rrf_score"] = round(entry["rrf_score"], 5)
+            entry["match_score"] = entry["rrf_score"]
+        return results
+
+    def search_by_catalog_page(self, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of the catalog ranking. The top CATALOG_RANKED_DEPTH candidates are ranked
+        once and cached; pages past that run the ranking query with a keyset cursor,
+        so each request returns at most `limit` rows however deep it is.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        depth = max(limit, settings.catalog_ranked_depth)
+        key = ("catalog", settings.skill_match_threshold, depth)
+        ranked = self.ranking_cache.get(key)
+        if ranked is None:
+            ranked = sorted(self.repo.search_candidates_by_skill_catalog(depth), key=_rank_key)
+            self.ranking_cache.put(key, ranked)
+        truncated = len(ranked) >= depth
+
+        page, more = _page(ranked, limit, after)
+        need = limit - len(page)
+        if truncated and need > 0:
+            # Past the cached ranking: continue in SQL from the last row shown
+            resume = (page[-1]["score"], page[-1]["candidate_id"]) if page else after
+            rows = self.repo.search_candidates_by_skill_catalog(need + 1, after=resume)
+            page, more = page + rows[:need], len(rows) > need
+        elif truncated:
+            more = True  # rows beyond the cached depth may follow
+        return {"results": page, "next_cursor": encode_cursor(page[-1]) if more and page else None}
 
     def search_by_catalog(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -109,6 +384,8 @@ class SearchService:
         """
         return self.repo.search_candidates_by_skill_catalog(limit)
 
-    def search_by_catalog_skill(self, skill_name: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def search_by_catalog_skill(
+        self, skill_name: str, limit: int = 50, filters: Optional[SearchFilters] = None
+    ) -> List[Dict[str, Any]]:
         """Search candidates matching a SPECIFIC skill from the catalog."""
-        return self.repo.search_candidates_by_single_skill(skill_name, limit)
\ No newline at end of file
+        return self.repo.search_candidates_by_single_skill(skill_name, limit, filters=filters)
\ No newline at end of file
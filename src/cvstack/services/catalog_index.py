@@ -0,0 +1,155 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..db.repository import Repository, pooled_repository
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    ids: np.ndarray  # int64 skill ids, row-aligned with matrix
+    names: List[str]
+    matrix: np.ndarray  # float32, one L2-normalized row per skill
+    version: Tuple[Any, ...] = ()  # Repository.skill_catalog_version() when loaded
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class CatalogIndex:
+    """
+    In-memory copy of the skill catalog as one normalized float32 matrix, so scoring a
+    candidate's sections against every skill is a single matrix multiply
+    (BLAS, multi-threaded and outside the GIL) instead of a CROSS JOIN in Postgres.
+    Loaded at startup and reloaded whenever the catalog version in the DB changes
+    (checked on every use, so uploads through other processes are picked up at once).
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {"loads": 0, "matched_cvs": 0, "refreshes": 0, "last_refresh_ms": 0.0}
+
+    def load(self, repo: Optional[Repository] = None) -> CatalogSnapshot:
+        if repo is None:
+            with pooled_repository() as pooled:
+                return self.load(pooled)
+        # Version first: a change in between only makes the next current() reload again
+        version = repo.skill_catalog_version()
+        rows = repo.get_skill_vectors()
+
+        dim = rows[0][2].shape[0] if rows else settings.embedding_dim
+        snapshot = CatalogSnapshot(
+            ids=np.array([r[0] for r in rows], dtype=np.int64),
+            names=[r[1] for r in rows],
+            matrix=_normalize(np.vstack([r[2] for r in rows])) if rows else np.zeros((0, dim), dtype=np.float32),
+            version=version,
+        )
+        with self._lock:
+            self._snapshot = snapshot
+            self.stats["loads"] += 1
+        log.info(f"Catalog index loaded: {len(snapshot)} skills")
+        return snapshot
+
+    def current(self, repo: Optional[Repository] = None) -> CatalogSnapshot:
+        """The current catalog, (re)loaded on first use or when the DB's catalog version moved on."""
+        if repo is None:
+            with pooled_repository() as pooled:
+                return self.current(pooled)
+        current = self._snapshot
+        if current is None or repo.skill_catalog_version() != current.version:
+            current = self.load(repo)
+        return current
+
+    @staticmethod
+    def distances(vectors: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Cosine distances, rows: vectors, columns: catalog rows. One matrix multiply."""
+        return 1.0 - _normalize(vectors) @ matrix.T
+
+    def match(
+        self, vectors: Sequence[Optional[np.ndarray]], snap: Optional[CatalogSnapshot] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        (skill_id, best distance) for one CV's section vectors, under SKILL_MATCH_THRESHOLD.
+        Callers that store the result keep snap.version with it (see Repository._write_skill_matches).
+        """
+        present = [v for v in vectors if v is not None]
+        snap = snap if snap is not None else self.current()
+        if not present or not len(snap):
+            return []
+        ids = snap.ids
+        best = self.distances(np.vstack(present), snap.matrix).min(axis=0)
+        hits = np.nonzero(best < settings.skill_match_threshold)[0]
+        with self._lock:
+            self.stats["matched_cvs"] += 1
+        return [(int(ids[i]), float(best[i])) for i in hits]
+
+    def refresh_matches(self, repo: Repository, skill_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute candidate_skill_matches for the given skills (all when None) from every
+        stored section vector, streamed in CATALOG_MATCH_BATCH chunks; each chunk is one
+        matrix multiply followed by a per-candidate minimum. Returns the rows written.
+        """
+        if skill_ids is not None and not skill_ids:
+            return 0
+        started = time.perf_counter()
+        snap = self.current(repo)
+        ids, matrix = snap.ids, snap.matrix
+        if skill_ids is not None:
+            keep = np.isin(ids, np.asarray(skill_ids, dtype=np.int64))
+            ids, matrix = ids[keep], matrix[keep]
+
+        def scored() -> Iterator[Tuple[List[int], List[int], List[Tuple[int, int, float]]]]:
+            batches = repo.iter_candidate_section_vectors(settings.catalog_match_batch)
+            for candidate_ids, section_ids, vectors in batches:
+                distances = self.distances(np.vstack(vectors), matrix)
+                # Rows are ordered by candidate, so each candidate is one contiguous block
+                candidates, starts = np.unique(np.asarray(candidate_ids, dtype=np.int64), return_index=True)
+                best = np.minimum.reduceat(distances, starts, axis=0)
+                newest_sections = np.maximum.reduceat(np.asarray(section_ids, dtype=np.int64), starts)
+                cand_idx, skill_idx = np.nonzero(best < settings.skill_match_threshold)
+                yield candidates.tolist(), newest_sections.tolist(), list(
+                    zip(candidates[cand_idx].tolist(), ids[skill_idx].tolist(), best[cand_idx, skill_idx].tolist())
+                )
+
+        # Each batch is written (COPY) as soon as it is scored, so memory stays at one batch
+        written = repo.replace_skill_matches(scored(), skill_ids)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.stats["refreshes"] += 1
+            self.stats["last_refresh_ms"] = round(elapsed_ms, 1)
+        log.info(f"Refreshed {written} candidate matches in-process in {elapsed_ms:.0f}ms")
+        return written
+
+    def snapshot(self) -> Dict[str, Any]:
+        current = self._snapshot
+        with self._lock:
+            return {**self.stats, "skills": len(current) if current is not None else 0}
+
+
+_default_index: Optional[CatalogIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_catalog_index() -> CatalogIndex:
+    """Process-wide catalog index shared by SearchService and the ingest pipeline."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = CatalogIndex()
+        return _default_index
@@ -1,54 +1,190 @@
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
-from typing import List
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from ..config import settings
+from ..db.repository import Repository
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Shared by every Embedder for embed_alongside, so a search doesn't start a pool per request
+_background_executor: Optional[ThreadPoolExecutor] = None
+_background_lock = threading.Lock()
+
+
+def _get_background_executor() -> ThreadPoolExecutor:
+    global _background_executor
+    with _background_lock:
+        if _background_executor is None:
+            _background_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.embedding_concurrency), thread_name_prefix="embed"
+            )
+        return _background_executor
+
+
+class EmbeddingError(RuntimeError):
+    """Raised when a batch still fails after all retries."""
+
+
 class Embedder:
-    def __init__(self):
+    def __init__(self, cache: Optional[EmbeddingCache] = None, dimensions: Optional[int] = None):
         # Ensure API Key is present
         if not settings.gemini_api_key:
             raise RuntimeError("GEMINI_API_KEY not set")
-        
+
         genai.configure(api_key=settings.gemini_api_key)
-        self.model = "models/text-embedding-004" 
+        self.model = settings.embedding_model
+        # Sent as output_dimensionality; must match the vector columns (checked at startup)
+        self.dimensions = dimensions or settings.embedding_dim
+        # Vectors of different sizes must never be served from the cache for each other
+        self.cache_model = f"{self.model}@{self.dimensions}"
+        # Shared process-wide cache unless one is injected
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.batch_size = max(1, settings.embedding_batch_size)
+        self.concurrency = max(1, settings.embedding_concurrency)
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def embed(
+        self, texts: List[str], task_type: str = "retrieval_document", repo: Optional[Repository] = None
+    ) -> List[Optional[np.ndarray]]:
         """
         Embeds a list of texts using Gemini.
-        CRITICAL: Filters out empty strings to prevent API errors.
+        Returns exactly one slot per input text, in input order. Empty/whitespace-only
+        texts are never sent to the API (it rejects them) and get None in their slot,
+        so callers can zip the result against their own ids safely.
+        Vectors are float32 numpy arrays, which the DB layer sends to pgvector in binary.
+        Texts already in the embedding cache (or repeated within the list) are not re-sent.
+        The rest is split into batches of EMBEDDING_BATCH_SIZE, sent with up to
+        EMBEDDING_CONCURRENCY requests in flight and retried with backoff.
+        Raises EmbeddingError if a batch keeps failing; batches that succeeded are
+        cached first, so calling again resumes where it stopped.
+        A caller that already holds a Repository passes it as repo, and the DB cache
+        tier uses that connection instead of borrowing a second one from the pool. The
+        cache is only read and written from the calling thread, never from the workers.
+        """
+        vectors, _ = self._embed(texts, task_type, repo)
+        return vectors
+
+    def embed_alongside(
+        self,
+        texts: List[str],
+        work: Callable[[], T],
+        task_type: str = "retrieval_document",
+        repo: Optional[Repository] = None,
+    ) -> Tuple[List[Optional[np.ndarray]], T]:
+        """
+        embed(), with the API calls on a background thread while work() runs on this one
+        (e.g. a DB query on repo's connection). Cache reads and writes stay on this thread,
+        before and after work(), so repo is never used from two threads at once.
+        Returns (vectors, work's result).
         """
-        # 1. Clean inputs: Remove newlines, strip whitespace, remove empty strings
-        clean_texts = [
-            t.replace("\n", " ").strip() 
-            for t in texts 
-            if t and t.strip() # <--- This check prevents the error
-        ]
-        
-        # 2. Safety Valve: If nothing is left, return empty list immediately
+        return self._embed(texts, task_type, repo, work)
+
+    def _embed(
+        self,
+        texts: List[str],
+        task_type: str,
+        repo: Optional[Repository],
+        work: Optional[Callable[[], T]] = None,
+    ) -> Tuple[List[Optional[np.ndarray]], Optional[T]]:
+        # 1. Clean inputs: Remove newlines, strip whitespace; blanks stay as "" placeholders
+        slots = [t.replace("\n", " ").strip() if t else "" for t in texts]
+        clean_texts = [t for t in slots if t]
+
+        # 2. Safety Valve: If nothing is left, skip the API call entirely
+        by_hash: Dict[str, np.ndarray] = {}
+        to_embed: List[str] = []
         if not clean_texts:
             log.warning("Embedder received empty or whitespace-only text list. Skipping API call.")
-            return []
+        else:
+            # 3. Cache lookup: only unique, uncached texts go to the API
+            by_hash = self.cache.get_many(self.cache_model, task_type, clean_texts, repo=repo)
+            pending = set()
+            for t in clean_texts:
+                h = self.cache.text_hash(t)
+                if h not in by_hash and h not in pending:
+                    pending.add(h)
+                    to_embed.append(t)
+
+        batches = [to_embed[i:i + self.batch_size] for i in range(0, len(to_embed), self.batch_size)]
+        if batches:
+            log.info(f"Generating Gemini embeddings for {len(to_embed)} texts in {len(batches)} batch(es) "
+                     f"({len(clean_texts) - len(to_embed)} cached or repeated)...")
+
+        # 4. Call Gemini API (map keeps batch order); workers only talk to the API
+        outcome: Optional[T] = None
+        if work is None:
+            results = self._embed_batches(batches, task_type)
+        else:
+            future = _get_background_executor().submit(self._embed_batches, batches, task_type) if batches else None
+            try:
+                outcome = work()
+            finally:
+                results = future.result() if future is not None else []
+
+        if batches:
+            # 5. Cache what succeeded (on this thread, so repo's connection is never shared)
+            embedded = [
+                (t, vector)
+                for batch, vectors in zip(batches, results) if not isinstance(vectors, EmbeddingError)
+                for t, vector in zip(batch, vectors)
+            ]
+            self.cache.put_many(self.cache_model, task_type, embedded, repo=repo)
+            failed = next((r for r in results if isinstance(r, EmbeddingError)), None)
+            if failed is not None:
+                raise failed
+            for t, vector in embedded:
+                by_hash[self.cache.text_hash(t)] = vector
+
+        # 6. Return results aligned with the input (None for skipped blanks)
+        return [by_hash[self.cache.text_hash(t)] if t else None for t in slots], outcome
 
+    def _embed_batches(self, batches: List[List[str]], task_type: str) -> List[Union[List[np.ndarray], EmbeddingError]]:
+        if len(batches) <= 1:
+            return [self._embed_batch_or_error(b, task_type) for b in batches]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+            return list(pool.map(lambda b: self._embed_batch_or_error(b, task_type), batches))
+
+    def _embed_batch_or_error(self, batch: List[str], task_type: str) -> Union[List[np.ndarray], EmbeddingError]:
+        # Failures come back as values so the other batches' vectors can still be cached
         try:
-            log.info(f"Generating Gemini embeddings for {len(clean_texts)} texts...")
-            
-            # 3. Call Gemini API
-            result = genai.embed_content(
-                model=self.model,
-                content=clean_texts,
-                task_type="retrieval_document"
-            )
+            return self._embed_batch(batch, task_type)
+        except EmbeddingError as e:
+            return e
+
+    def _embed_batch(self, batch: List[str], task_type: str) -> List[np.ndarray]:
+        """One embed_content call with retry + exponential backoff."""
+        attempts = max(1, settings.embedding_max_retries)
+        for attempt in range(1, attempts + 1):
+            try:
+                result = genai.embed_content(
+                    model=self.model,
+                    content=batch,
+                    task_type=task_type,
+                    output_dimensionality=self.dimensions,
+                )
+                if 'embedding' not in result:
+                    raise EmbeddingError("Gemini response missing 'embedding' key")
+
+                vectors = [np.asarray(v, dtype=np.float32) for v in result['embedding']]
+                if len(vectors) != len(batch):
+                    raise EmbeddingError(f"Gemini returned {len(vectors)} embeddings for {len(batch)} texts")
+                if any(len(v) != self.dimensions for v in vectors):
+                    raise EmbeddingError(f"Gemini returned {len(vectors[0])}-dim embeddings, expected {self.dimensions}")
+
+                return vectors
 
-            # 4. Return results
-            if 'embedding' in result:
-                return result['embedding']
-            else:
-                log.error("Gemini response missing 'embedding' key")
-                return []
-
-        except Exception as e:
-            log.error(f"Gemini embedding failed: {e}")
-            # Do not crash the app, just return empty so the process can continue
-            return []
\ No newline at end of file
+            except Exception as e:
+                if attempt == attempts:
+                    log.error(f"Gemini embedding failed after {attempts} attempts: {e}")
+                    raise EmbeddingError(f"Embedding batch of {len(batch)} texts failed: {e}") from e
+                delay = settings.embedding_retry_backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25)
+                log.warning(f"Gemini embedding attempt {attempt}/{attempts} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+        return []
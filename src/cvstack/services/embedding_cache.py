@@ -0,0 +1,128 @@
+from __future__ import annotations
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..db.repository import Repository, pooled_repository
+
+log = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]  # (model, task_type, text_hash)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (model, task_type, normalized text hash):
+    an in-process LRU in front of the Postgres embedding_cache table.
+    """
+
+    def __init__(self, max_items: Optional[int] = None, use_db: Optional[bool] = None) -> None:
+        self.max_items = max_items if max_items is not None else settings.embedding_cache_size
+        self.use_db = use_db if use_db is not None else settings.embedding_cache_db
+        self._lru: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    @classmethod
+    def text_hash(cls, text: str) -> str:
+        return hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    @contextmanager
+    def _db(repo: Optional[Repository]) -> Iterator[Repository]:
+        """The caller's Repository when it has one, so a request never holds two pooled connections."""
+        if repo is None:
+            with pooled_repository() as db:
+                yield db
+            return
+        try:
+            yield repo
+        except Exception:
+            # Don't leave the caller's connection in an aborted transaction
+            repo.conn.rollback()
+            raise
+
+    def get_many(
+        self, model: str, task_type: str, texts: Sequence[str], repo: Optional[Repository] = None
+    ) -> Dict[str, np.ndarray]:
+        """Return {text_hash: vector} for every text found in either tier."""
+        hashes = list(dict.fromkeys(self.text_hash(t) for t in texts))
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for h in hashes:
+                key = (model, task_type, h)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[h] = self._lru[key]
+            self.stats["memory_hits"] += len(found)
+
+        missing = [h for h in hashes if h not in found]
+        if missing and self.use_db:
+            try:
+                with self._db(repo) as db:
+                    from_db = db.get_cached_embeddings(model, task_type, missing)
+            except Exception as e:
+                log.warning(f"Embedding cache DB lookup failed, continuing without it: {e}")
+                from_db = {}
+            found.update(from_db)
+            self._remember(model, task_type, from_db.items())
+            with self._lock:
+                self.stats["db_hits"] += len(from_db)
+
+        with self._lock:
+            self.stats["misses"] += len(hashes) - len(found)
+        return found
+
+    def put_many(
+        self, model: str, task_type: str, items: Sequence[Tuple[str, np.ndarray]], repo: Optional[Repository] = None
+    ) -> None:
+        """Store (text, vector) pairs in both tiers."""
+        entries = [(self.text_hash(text), np.asarray(vector, dtype=np.float32)) for text, vector in items]
+        if not entries:
+            return
+        self._remember(model, task_type, entries)
+        if self.use_db:
+            try:
+                with self._db(repo) as db:
+                    db.put_cached_embeddings(model, task_type, entries)
+            except Exception as e:
+                log.warning(f"Embedding cache DB write failed: {e}")
+        with self._lock:
+            self.stats["writes"] += len(entries)
+
+    def _remember(self, model: str, task_type: str, entries) -> None:
+        with self._lock:
+            for h, vector in entries:
+                key = (model, task_type, h)
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "memory_entries": len(self._lru)}
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache shared by every Embedder instance."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..db.repository import pooled_repository
+from ..prompts.extraction import PROMPT_VERSION
+
+log = logging.getLogger(__name__)
+
+EVICT_EVERY = 100  # run TTL/size eviction once per this many writes
+
+
+class ExtractionCache:
+    """
+    Postgres-backed cache of CVExtractor results keyed by (model, prompt version, CV text).
+    PROMPT_VERSION is a fingerprint of the prompts and schemas, so editing them
+    invalidates old entries without any manual flush.
+    """
+
+    def __init__(self, ttl_days: Optional[int] = None, max_entries: Optional[int] = None) -> None:
+        self.ttl_seconds = (ttl_days if ttl_days is not None else settings.extraction_cache_ttl_days) * 86400
+        self.max_entries = max_entries if max_entries is not None else settings.extraction_cache_max_entries
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, cv_text: str, prompt_version: str = PROMPT_VERSION) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, cv_text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with pooled_repository() as repo:
+                result = repo.get_cached_extraction(key, self.ttl_seconds)
+        except Exception as e:
+            log.warning(f"Extraction cache lookup failed, extracting anyway: {e}")
+            result = None
+        with self._lock:
+            self.stats["hits" if result is not None else "misses"] += 1
+        return result
+
+    def put(self, key: str, model: str, result: Dict[str, Any]) -> None:
+        try:
+            with pooled_repository() as repo:
+                repo.put_cached_extraction(key, model, PROMPT_VERSION, result)
+                with self._lock:
+                    self.stats["writes"] += 1
+                    evict = self.stats["writes"] % EVICT_EVERY == 0
+                if evict:
+                    removed = repo.evict_extraction_cache(self.ttl_seconds, self.max_entries)
+                    with self._lock:
+                        self.stats["evicted"] += removed
+        except Exception as e:
+            log.warning(f"Extraction cache write failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "prompt_version": PROMPT_VERSION}
+
+
+_default_cache: Optional[ExtractionCache] = None
+_default_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide cache shared by every CVExtractor instance."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
@@ -3,25 +3,32 @@ import json
 import re
 import logging
 import tempfile
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 import google.generativeai as genai
 import pandas as pd
+from pydantic import ValidationError
 
 from ..config import settings
 from ..prompts.extraction import (
+    COMBINED_SYSTEM_PROMPT,
     CV_EXTRACTION_SYSTEM_PROMPT,
     SKILL_RATING_SYSTEM_PROMPT,
+    build_combined_extraction_prompt,
     build_cv_extraction_prompt,
     build_skill_rating_prompt,
 )
+from ..schemas.cv import ParsedCV
+from .extraction_cache import ExtractionCache, get_extraction_cache
+from .preprocess import PREPROCESS_VERSION, prepare_cv_text
 
 log = logging.getLogger(__name__)
 
 class CVExtractor:
-    def __init__(self) -> None:
+    def __init__(self, cache: Optional[ExtractionCache] = None, use_cache: bool = True) -> None:
         # Safety Check for API Key
         if not settings.gemini_api_key:
             import os
@@ -33,59 +40,82 @@ class CVExtractor:
             genai.configure(api_key=settings.gemini_api_key)
 
         model_name = getattr(settings, "extraction_model", "gemini-1.5-flash")
+        self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
         log.info(f"Using extraction model: {model_name}")
 
+        # Results only depend on (model, prompts, CV text), so they are safe to reuse
+        if cache is None and use_cache and settings.extraction_cache_enabled:
+            cache = get_extraction_cache()
+        self.cache = cache if use_cache else None
+
     @staticmethod
     def _strip_fences(s: str) -> str:
         return re.sub(r"^```(?:json)?\s*|\s*```$", "", s.strip(), flags=re.IGNORECASE | re.DOTALL)
 
-    def extract(self, cv_text: str) -> Dict[str, Any]:
+    def extract(self, cv_text: str, mode: Optional[str] = None) -> Dict[str, Any]:
+        parsed, _ = self.extract_with_metrics(cv_text, mode)
+        return parsed
+
+    def extract_with_metrics(self, cv_text: str, mode: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run the extraction and also return per-CV call metrics
+        (LLM calls, prompt/output tokens, latency, whether combined mode fell back).
+        mode: "two_step" (extraction, then skill rating) or "combined" (one call);
+        defaults to settings.extraction_mode.
+        """
         if not cv_text or not cv_text.strip():
             raise ValueError("CV text is empty, cannot extract")
 
-        log.info(f"[EXTRACTOR] Processing text length: {len(cv_text)}")
-        cv_text_trimmed = cv_text[:200000]
+        mode = mode or settings.extraction_mode
+        if mode not in ("two_step", "combined"):
+            raise ValueError(f"Unknown extraction mode: {mode}")
+
+        log.info(f"[EXTRACTOR] Processing text length: {len(cv_text)} (mode={mode})")
+        metrics: Dict[str, Any] = {
+            "mode": mode, "calls": 0, "prompt_tokens": 0, "output_tokens": 0,
+            "latency_ms": 0.0, "fallback": False, "cached": False,
+        }
+
+        if settings.cv_preprocess:
+            prepared = prepare_cv_text(cv_text)
+            cv_text_trimmed = prepared.text[:200000]
+            skill_text = prepared.skill_text[:200000]
+            report = prepared.report()
+            metrics["preprocess"] = report
+            saved = 1 - report["chars_after"] / report["chars_before"] if report["chars_before"] else 0.0
+            log.info(
+                f"[EXTRACTOR] Preprocessed {report['chars_before']} -> {report['chars_after']} chars ({saved:.0%} smaller), "
+                f"~{report['est_tokens_after']} tokens; skill rating gets ~{report['est_skill_tokens']} tokens"
+            )
+            cache_model = f"{self.model_name}:{mode}:pp{PREPROCESS_VERSION}"
+        else:
+            cv_text_trimmed = cv_text[:200000]
+            skill_text = cv_text_trimmed
+            cache_model = f"{self.model_name}:{mode}"
+
+        cache_key = ExtractionCache.key(cache_model, cv_text_trimmed)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                log.info("[EXTRACTOR] Cache hit, skipping LLM calls")
+                metrics["cached"] = True
+                return cached, metrics
 
         try:
-            # ===== STEP 1: CV Extraction =====
-            log.info("[EXTRACTOR] Step 1: Extracting CV data...")
-            extraction_prompt = build_cv_extraction_prompt(cv_text_trimmed)
-            if not extraction_prompt or not extraction_prompt.strip():
-                raise ValueError("Prompt generation failed (empty prompt)")
-
-            # Use chat for system prompt support
-            chat = self.model.start_chat(history=[])
-            
-            # Send system prompt as first message context, then user prompt
-            step1_full_prompt = f"{CV_EXTRACTION_SYSTEM_PROMPT}\n\n{extraction_prompt}"
-            resp1 = chat.send_message(step1_full_prompt)
-            
-            raw_text1 = (resp1.text or "").strip()
-            if not raw_text1:
-                raise ValueError("Gemini returned empty response for CV extraction")
+            parsed = None
+            if mode == "combined":
+                parsed = self._extract_combined(cv_text_trimmed, metrics)
+                if parsed is None:
+                    log.warning("[EXTRACTOR] Combined response failed validation, falling back to two-step mode")
+                    metrics["fallback"] = True
+            if parsed is None:
+                parsed = self._extract_two_step(cv_text_trimmed, metrics, skill_text=skill_text)
 
-            # Parse Step 1 result
-            parsed = self._parse_json_response(raw_text1, "CV extraction")
-            
-            # ===== STEP 2: Skill Rating =====
-            log.info("[EXTRACTOR] Step 2: Rating skills with evidence...")
-            skill_prompt = build_skill_rating_prompt(cv_text_trimmed, parsed)
-            
-            # New chat for skill rating
-            chat2 = self.model.start_chat(history=[])
-            step2_full_prompt = f"{SKILL_RATING_SYSTEM_PROMPT}\n\n{skill_prompt}"
-            resp2 = chat2.send_message(step2_full_prompt)
-            
-            raw_text2 = (resp2.text or "").strip()
-            if not raw_text2:
-                log.warning("Gemini returned empty response for skill rating, keeping original skills")
-            else:
-                # Parse Step 2 result (should be JSON array)
-                skill_array = self._parse_json_response(raw_text2, "skill rating", expect_array=True)
-                if skill_array:
-                    parsed["user_skills"] = skill_array
-                    log.info(f"[EXTRACTOR] Rated {len(skill_array)} skills with evidence")
+            log.info(
+                f"[EXTRACTOR] {metrics['calls']} LLM call(s), {metrics['prompt_tokens']} prompt / "
+                f"{metrics['output_tokens']} output tokens, {metrics['latency_ms']:.0f} ms"
+            )
 
             # Save Debug Excel (Safe Path) - Always try to save if we have parsed data
             if parsed:
@@ -97,12 +127,96 @@ class CVExtractor:
                     import traceback
                     log.error(traceback.format_exc())
 
-            return parsed
+            if self.cache is not None:
+                self.cache.put(cache_key, cache_model, parsed)
+
+            return parsed, metrics
 
         except Exception as e:
             log.error(f"Error during extraction: {str(e)}")
             raise e
 
+    def _send(self, prompt: str, metrics: Dict[str, Any]) -> str:
+        """One LLM call in a fresh chat; accumulates token and latency metrics."""
+        # Use chat for system prompt support
+        chat = self.model.start_chat(history=[])
+        started = time.perf_counter()
+        resp = chat.send_message(prompt)
+        metrics["latency_ms"] += (time.perf_counter() - started) * 1000
+        metrics["calls"] += 1
+
+        usage = getattr(resp, "usage_metadata", None)
+        if usage is not None:
+            metrics["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+            metrics["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+        return (resp.text or "").strip()
+
+    def _extract_two_step(
+        self, cv_text_trimmed: str, metrics: Dict[str, Any], skill_text: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # ===== STEP 1: CV Extraction =====
+        log.info("[EXTRACTOR] Step 1: Extracting CV data...")
+        extraction_prompt = build_cv_extraction_prompt(cv_text_trimmed)
+        if not extraction_prompt or not extraction_prompt.strip():
+            raise ValueError("Prompt generation failed (empty prompt)")
+
+        # Send system prompt as first message context, then user prompt
+        raw_text1 = self._send(f"{CV_EXTRACTION_SYSTEM_PROMPT}\n\n{extraction_prompt}", metrics)
+        if not raw_text1:
+            raise ValueError("Gemini returned empty response for CV extraction")
+
+        # Parse Step 1 result
+        parsed = self._parse_json_response(raw_text1, "CV extraction")
+
+        # ===== STEP 2: Skill Rating =====
+        log.info("[EXTRACTOR] Step 2: Rating skills with evidence...")
+        # Only the skill-evidence sections when preprocessing found them
+        skill_prompt = build_skill_rating_prompt(skill_text or cv_text_trimmed, parsed)
+
+        # New chat for skill rating
+        raw_text2 = self._send(f"{SKILL_RATING_SYSTEM_PROMPT}\n\n{skill_prompt}", metrics)
+        if not raw_text2:
+            log.warning("Gemini returned empty response for skill rating, keeping original skills")
+        else:
+            # Parse Step 2 result (should be JSON array)
+            skill_array = self._parse_json_response(raw_text2, "skill rating", expect_array=True)
+            if skill_array:
+                parsed["user_skills"] = skill_array
+                log.info(f"[EXTRACTOR] Rated {len(skill_array)} skills with evidence")
+
+        return parsed
+
+    def _extract_combined(self, cv_text_trimmed: str, metrics: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Profile + rated skills in one call. Returns None when the response doesn't validate."""
+        log.info("[EXTRACTOR] Extracting CV data and rating skills in one call...")
+        prompt = build_combined_extraction_prompt(cv_text_trimmed)
+        raw = self._send(f"{COMBINED_SYSTEM_PROMPT}\n\n{prompt}", metrics)
+        if not raw:
+            return None
+        try:
+            parsed = self._parse_json_response(raw, "combined extraction")
+        except ValueError:
+            return None
+        return parsed if self._is_valid_combined(parsed) else None
+
+    @staticmethod
+    def _is_valid_combined(parsed: Any) -> bool:
+        if not isinstance(parsed, dict) or "user_profile" not in parsed:
+            return False
+        try:
+            # null lists/objects are tolerated, as in the two-step path
+            ParsedCV.model_validate({k: v for k, v in parsed.items() if v is not None})
+        except ValidationError as e:
+            log.warning(f"[EXTRACTOR] Combined response schema errors: {e.error_count()}")
+            return False
+        # Every skill must carry an evidence rating, otherwise the rating step was skipped
+        return all(
+            isinstance(skill, dict)
+            and isinstance(skill.get("system_rating"), int)
+            and 1 <= skill["system_rating"] <= 10
+            for skill in parsed.get("user_skills") or []
+        )
+
     def _parse_json_response(self, raw_text: str, step_name: str, expect_array: bool = False) -> Any:
         """Parse JSON from LLM response with fallback extraction."""
         raw = self._strip_fences(raw_text)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..sanitize import sanitize_text
+
+
+def _text(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    return " ".join(sanitize_text(value).split()) or None
+
+
+def _rating(value: Any) -> Optional[int]:
+    # Same rule as the extractor: an integer 1-10, anything else is unrated
+    if isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= 10:
+        return value
+    return None
+
+
+def extract_facets(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The filterable fields of a parsed CV, for the candidates facet columns.
+    Used at ingest and by scripts/backfill_candidate_facets.py, so both agree.
+    """
+    profile = parsed.get("user_profile") or {}
+    address = parsed.get("address") or {}
+    confidence = profile.get("role_confidence")
+    return {
+        "industry": _text(profile.get("industry")),
+        "target_role": _text(profile.get("target_role")),
+        "role_confidence": float(confidence) if isinstance(confidence, (int, float)) and not isinstance(confidence, bool) else None,
+        "country": _text(address.get("country")),
+        "currently_working": any((exp or {}).get("currently_working") is True for exp in parsed.get("experience") or []),
+    }
+
+
+def extract_skills(parsed: Dict[str, Any]) -> List[Tuple[str, Optional[int]]]:
+    """(skill, system_rating) per distinct skill (case-insensitive), keeping the highest rating."""
+    best: Dict[str, Tuple[str, Optional[int]]] = {}
+    for entry in parsed.get("user_skills") or []:
+        name = _text((entry or {}).get("skill"))
+        if name is None:
+            continue
+        rating = _rating(entry.get("system_rating"))
+        key = name.lower()
+        if key not in best or (rating or 0) > (best[key][1] or 0):
+            best[key] = (best[key][0] if key in best else name, rating)
+    return list(best.values())
@@ -0,0 +1,185 @@
+from __future__ import annotations
+import hashlib
+import io
+import logging
+import re
+import tempfile
+from typing import Any, Dict, Optional
+
+from pypdf import PdfReader
+
+from ..cli.app import build_sections
+from ..db.repository import Repository, pooled_repository
+from ..sanitize import sanitize_multiline
+from .catalog_index import CatalogIndex, get_catalog_index
+from .embedder import Embedder
+from .extractor import CVExtractor
+from .facets import extract_facets, extract_skills
+from .pdf_text import file_sha256, parse_pdf_pages
+from .preprocess import PAGE_BREAK
+
+log = logging.getLogger(__name__)
+
+
+class IngestPipeline:
+    """
+    The CV ingest stages: text extraction -> LLM extraction -> Excel export ->
+    embedding -> DB save. One instance (and its extractor/embedder) is shared
+    by every worker thread.
+    """
+
+    def __init__(
+        self,
+        extractor: Optional[CVExtractor] = None,
+        embedder: Optional[Embedder] = None,
+        catalog: Optional[CatalogIndex] = None,
+    ) -> None:
+        self.extractor = extractor if extractor is not None else CVExtractor()
+        self.embedder = embedder if embedder is not None else Embedder()
+        self.catalog = catalog if catalog is not None else get_catalog_index()
+
+    @staticmethod
+    def extract_text(filename: Optional[str], content: bytes) -> str:
+        # PDF Parsing
+        if filename and filename.lower().endswith(".pdf"):
+            try:
+                reader = PdfReader(io.BytesIO(content))
+                # Pages stay separated so preprocessing can spot running headers/footers
+                text = PAGE_BREAK.join([sanitize_multiline(p.extract_text() or "") for p in reader.pages])
+            except Exception as e:
+                raise ValueError(f"PDF parse failed: {e}")
+        else:
+            text = sanitize_multiline(content.decode("utf-8", errors="ignore"))
+
+        if not text.replace(PAGE_BREAK, "").strip():
+            raise ValueError("No text extracted")
+        return text
+
+    @staticmethod
+    def extract_text_from_path(filename: Optional[str], path: str) -> str:
+        """
+        Same as extract_text for a file on disk. PDFs are parsed on the shared
+        process pool (page ranges in parallel, with PDF_TIMEOUT / PDF_MAX_PAGES),
+        never on the calling thread.
+        """
+        name = filename or path
+        if name.lower().endswith(".pdf"):
+            # Each page is already sanitized in the worker
+            text = PAGE_BREAK.join(parse_pdf_pages(path))
+        else:
+            with open(path, "rb") as f:
+                text = sanitize_multiline(f.read().decode("utf-8", errors="ignore"))
+
+        if not text.replace(PAGE_BREAK, "").strip():
+            raise ValueError("No text extracted")
+        return text
+
+    @classmethod
+    def extract_text_from_bytes(cls, filename: Optional[str], content: bytes) -> str:
+        """
+        extract_text with the PDF_MAX_PAGES / PDF_TIMEOUT guards: PDFs are handed to the
+        shared process pool through a temp file (extract_text_from_path).
+        """
+        if filename and filename.lower().endswith(".pdf"):
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+                tmp.write(content)
+                tmp.flush()
+                return cls.extract_text_from_path(filename, tmp.name)
+        return cls.extract_text(filename, content)
+
+    @staticmethod
+    def source_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Hash of the normalized extracted text (must match the backfill in migration 0007)."""
+        normalized = re.sub(r"\s+", " ", text).strip().lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def run(self, filename: Optional[str], content: bytes, force: bool = False) -> Dict[str, Any]:
+        log.info(f"[INGEST] filename={filename}")
+        text = self.extract_text_from_bytes(filename, content)
+        return self.process_text(text, source_hash=self.source_hash(content), force=force)
+
+    def run_path(self, filename: Optional[str], path: str, force: bool = False) -> Dict[str, Any]:
+        """Ingest a spooled upload without loading it into memory first."""
+        log.info(f"[INGEST] filename={filename} path={path}")
+        text = self.extract_text_from_path(filename, path)
+        return self.process_text(text, source_hash=file_sha256(path), force=force)
+
+    def process_text(self, text: str, source_hash: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Everything after text extraction (LLM, Excel, embedding, DB).
+        A CV whose normalized text is already stored short-circuits to the existing
+        candidate before any LLM call; force=True re-extracts it in place.
+        """
+        prepared = self.prepare(text, source_hash=source_hash, force=force)
+        if prepared["duplicate"]:
+            return prepared
+
+        # Database Save: one transaction, connection only borrowed once the LLM/embedding work is done
+        with pooled_repository() as repo:
+            candidate_id = repo.save_parsed_cv(prepared["cv"])
+            return self.saved(repo, prepared, candidate_id)
+
+    def prepare(self, text: str, source_hash: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        The LLM / Excel / embedding stages, with no DB writes. Returns either a duplicate
+        result or {"duplicate": False, "parsed": ..., "cv": <record for Repository.save_parsed_cv>}.
+        """
+        content_hash = self.content_hash(text)
+        with pooled_repository() as repo:
+            existing_id = repo.find_candidate_by_content_hash(content_hash)
+        if existing_id is not None and not force:
+            log.info(f"[INGEST] duplicate CV, reusing candidate {existing_id}")
+            return {"candidate_id": existing_id, "duplicate": True}
+
+        # Extraction
+        parsed = self.extractor.extract(text)
+
+        # Explicitly save to Excel (backup in case internal save fails)
+        try:
+            excel_path = self.extractor.save_to_csv(parsed)
+            log.info(f"[INGEST] Excel saved to: {excel_path}")
+        except Exception as excel_err:
+            log.warning(f"[INGEST] Failed to save Excel: {excel_err}")
+
+        profile = parsed.get("user_profile") or {}
+
+        # build_sections already sanitized every field the texts are built from
+        section_rows, texts = build_sections(parsed, existing_id)
+
+        # One slot per text (None for blanks), so vectors line up with the section rows
+        vectors = self.embedder.embed(texts) if texts else []
+
+        cv = {
+            "candidate_id": existing_id,
+            "full_name": f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip() or None,
+            "email": profile.get("email"),
+            "raw_text": text,
+            "source_hash": source_hash,
+            "content_hash": content_hash,
+            "sections": section_rows,
+            "vectors": vectors,
+            "facets": extract_facets(parsed),
+            "skills": extract_skills(parsed),
+        }
+        # Catalog matches are scored here, in-process, rather than by a CROSS JOIN at save time
+        try:
+            snap = self.catalog.current()
+            cv["skill_matches"] = self.catalog.match(vectors, snap)
+            # Checked again at save time; a catalog changed meanwhile falls back to matching in SQL
+            cv["catalog_version"] = snap.version
+        except Exception as e:
+            log.warning(f"[INGEST] In-process catalog matching failed, leaving it to the DB: {e}")
+        return {"duplicate": False, "parsed": parsed, "cv": cv}
+
+    @staticmethod
+    def saved(repo: Repository, prepared: Dict[str, Any], candidate_id: Optional[int]) -> Dict[str, Any]:
+        """Turn a save_parsed_cv(s) result into the ingest result."""
+        if candidate_id is None:
+            # Another worker stored the same CV while we were extracting
+            candidate_id = repo.find_candidate_by_content_hash(prepared["cv"]["content_hash"])
+            return {"candidate_id": candidate_id, "duplicate": True}
+        return {"candidate_id": candidate_id, "duplicate": False, "parsed": prepared["parsed"]}
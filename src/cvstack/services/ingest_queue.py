@@ -0,0 +1,149 @@
+from __future__ import annotations
+import logging
+import os
+import socket
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..db.repository import check_vector_schema, open_pool, close_pool, pooled_repository
+from .ingest import IngestPipeline
+from .pdf_text import shutdown_pdf_executor
+
+log = logging.getLogger(__name__)
+
+# Recorded on jobs spooled to this host's local UPLOAD_SPOOL_DIR (see Repository.claim_ingest_job)
+SPOOL_HOST = socket.gethostname()
+
+
+class IngestWorkerPool:
+    """
+    Background workers draining the ingest_jobs table.
+    Jobs are claimed with SKIP LOCKED, so several pools (API processes or
+    standalone `python -m cvstack.services.ingest_queue` workers) can run side by side.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pipeline: Optional[IngestPipeline] = None) -> None:
+        self.workers = workers if workers is not None else settings.ingest_workers
+        self._pipeline = pipeline
+        self._pipeline_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @property
+    def pipeline(self) -> IngestPipeline:
+        # Built lazily so the API can start without GEMINI_API_KEY when no worker is needed yet
+        with self._pipeline_lock:
+            if self._pipeline is None:
+                self._pipeline = IngestPipeline()
+            return self._pipeline
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._threads:
+            return
+        with pooled_repository() as repo:
+            requeued = repo.requeue_stale_ingest_jobs(settings.ingest_job_timeout)
+        if requeued:
+            log.info(f"Requeued {requeued} stale ingest jobs")
+
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"ingest-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        log.info(f"Started {self.workers} ingest workers")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers right away instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.process_one()
+            except Exception as e:
+                log.error(f"Ingest worker loop error: {e}")
+                processed = False
+            if not processed:
+                self._wake.wait(settings.ingest_poll_interval)
+                self._wake.clear()
+
+    def process_one(self) -> bool:
+        """Claim and run a single job. Returns False when the queue is empty."""
+        with pooled_repository() as repo:
+            job = repo.claim_ingest_job(SPOOL_HOST)
+        if job is None:
+            return False
+
+        log.info(f"[JOB {job['id']}] started (attempt {job['attempts']})")
+        try:
+            if job["source_path"]:
+                result = self.pipeline.run_path(job["filename"], job["source_path"], force=job["force"])
+            else:
+                result = self.pipeline.run(job["filename"], job["content"], force=job["force"])
+        except Exception as e:
+            retry = job["attempts"] < settings.ingest_max_attempts
+            log.error(f"[JOB {job['id']}] failed: {e} ({'will retry' if retry else 'giving up'})")
+            with pooled_repository() as repo:
+                repo.fail_ingest_job(job["id"], str(e), retry=retry)
+            if not retry:
+                self._remove_spooled(job)
+            return True
+
+        with pooled_repository() as repo:
+            repo.complete_ingest_job(job["id"], result.get("candidate_id"), result)
+        self._remove_spooled(job)
+        log.info(f"[JOB {job['id']}] done -> candidate {result.get('candidate_id')}")
+        return True
+
+
+    @staticmethod
+    def _remove_spooled(job: Dict[str, Any]) -> None:
+        if job["source_path"]:
+            try:
+                os.remove(job["source_path"])
+            except OSError as e:
+                log.warning(f"[JOB {job['id']}] could not remove spooled upload: {e}")
+
+
+def check_spool_dir() -> None:
+    """A standalone worker runs spooled jobs only if it can reach the API's UPLOAD_SPOOL_DIR."""
+    if not settings.upload_spool_shared:
+        return
+    if not os.path.isdir(settings.upload_spool_dir) or not os.access(settings.upload_spool_dir, os.R_OK | os.W_OK):
+        raise RuntimeError(
+            f"UPLOAD_SPOOL_DIR {settings.upload_spool_dir} is not a readable/writable directory on this host; "
+            f"mount the API's spool directory here or unset UPLOAD_SPOOL_DIR so jobs carry their bytes"
+        )
+
+
+def main() -> None:
+    """Run standalone ingest workers (scale ingest throughput independently of the API)."""
+    from ..logging_conf import configure_logging
+
+    configure_logging()
+    check_spool_dir()
+    open_pool()
+    check_vector_schema()
+    workers = IngestWorkerPool(workers=max(1, settings.ingest_workers))
+    workers.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        workers.stop()
+        shutdown_pdf_executor()
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
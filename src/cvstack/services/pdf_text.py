@@ -0,0 +1,107 @@
+from __future__ import annotations
+import hashlib
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import List, Optional
+
+from pypdf import PdfReader
+
+from ..config import settings
+from ..sanitize import sanitize_multiline
+
+log = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every PDF parse in this process (created on first use).
+    Workers are not forked from this (multi-threaded: DB pool, ingest workers, uvicorn)
+    process, where they could inherit locks held by other threads at fork time.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _executor = ProcessPoolExecutor(max_workers=settings.pdf_workers, mp_context=multiprocessing.get_context(method))
+        return _executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[str]:
+    # Runs in a worker process: parse + sanitize pages [start, end)
+    reader = PdfReader(path)
+    return [sanitize_multiline(reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+def parse_pdf_pages(
+    path: str,
+    max_pages: Optional[int] = None,
+    timeout: Optional[float] = None,
+    pages_per_task: Optional[int] = None,
+) -> List[str]:
+    """
+    The sanitized text of each page, in order. Page ranges are parsed in parallel on
+    the shared process pool; the whole document must finish within `timeout` seconds
+    and at most `max_pages` are read. All pages are returned together: header/footer
+    detection in preprocessing compares every page, so it can't start any earlier.
+    """
+    max_pages = max_pages if max_pages is not None else settings.pdf_max_pages
+    timeout = timeout if timeout is not None else settings.pdf_timeout
+    pages_per_task = max(1, pages_per_task or settings.pdf_pages_per_task)
+    deadline = time.monotonic() + timeout
+    executor = get_pdf_executor()
+
+    try:
+        total = executor.submit(_page_count, path).result(timeout=timeout)
+    except FutureTimeout:
+        raise ValueError(f"PDF parse timed out after {timeout:.0f}s")
+    except Exception as e:
+        raise ValueError(f"PDF parse failed: {e}")
+
+    if max_pages and total > max_pages:
+        log.warning(f"PDF has {total} pages, only the first {max_pages} are parsed")
+        total = max_pages
+
+    futures: List[Future] = [
+        executor.submit(_extract_page_range, path, start, min(start + pages_per_task, total))
+        for start in range(0, total, pages_per_task)
+    ]
+    pages: List[str] = []
+    try:
+        for future in futures:
+            remaining = deadline - time.monotonic()
+            try:
+                pages.extend(future.result(timeout=max(0.0, remaining)))
+            except FutureTimeout:
+                raise ValueError(f"PDF parse timed out after {timeout:.0f}s")
+            except Exception as e:
+                raise ValueError(f"PDF parse failed: {e}")
+    finally:
+        for future in futures:
+            future.cancel()
+    return pages
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# Page separator used when PDF pages are joined (see IngestPipeline.extract_text)
+PAGE_BREAK = "\f"
+
+# Bump when the cleaning rules change, so cached extractions built from older output are not reused
+PREPROCESS_VERSION = "3"
+
+# Rough chars-per-token ratio for Gemini on English prose; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+SECTION_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary", "profile", "professional summary", "career summary", "about me", "objective",
+                "career objective", "personal statement"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "academic qualifications", "education and training",
+                  "qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "skill set", "skills and abilities",
+               "competencies", "core competencies", "technologies", "tools and technologies", "tech stack"),
+    "projects": ("projects", "personal projects", "key projects", "academic projects", "selected projects"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "certifications and courses",
+                       "courses", "training"),
+    "languages": ("languages",),
+    "awards": ("awards", "achievements", "honors", "honours", "awards and achievements"),
+    "publications": ("publications", "research"),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references", "referees"),
+}
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# Sections the skill-rating step needs as evidence; "header" (text above the first heading)
+# often holds the title line and a headline skill list
+SKILL_SECTIONS = ("header", "summary", "experience", "skills", "projects", "certifications")
+# Sections no schema field uses; dropped from the prompt entirely
+DROPPED_SECTIONS = ("references",)
+
+_BOILERPLATE = re.compile(
+    r"^(curriculum vitae|resume|r[ée]sum[ée]|references? (are )?available (up)?on request\.?|page \d+( of \d+)?)$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PreparedCV:
+    text: str
+    sections: List[Tuple[str, str]] = field(default_factory=list)  # (section name, body) in document order
+    original_chars: int = 0
+
+    @property
+    def skill_text(self) -> str:
+        """Only the sections that carry skill evidence; the full text when no headings were found."""
+        relevant = [(name, body) for name, body in self.sections if name in SKILL_SECTIONS]
+        if not relevant:
+            return self.text
+        return "\n\n".join(body if name == "header" else f"{name.upper()}\n{body}" for name, body in relevant)
+
+    def report(self) -> Dict[str, int]:
+        return {
+            "chars_before": self.original_chars,
+            "chars_after": len(self.text),
+            "est_tokens_before": estimate_tokens_for(self.original_chars),
+            "est_tokens_after": estimate_tokens(self.text),
+            "skill_chars": len(self.skill_text),
+            "est_skill_tokens": estimate_tokens(self.skill_text),
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    return estimate_tokens_for(len(text))
+
+
+def estimate_tokens_for(chars: int) -> int:
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+# Page-number lines: "Page 2 of 5", "2 / 5", "- 2 -", a bare "2"
+_PAGE_NUMBER = re.compile(r"^[-–—\s]*(page\s*)?\d+(\s*(of|/)\s*\d+)?[-–—\s]*$", re.IGNORECASE)
+
+
+def _line_key(line: str) -> str:
+    # Only page numbers differ per page; everything else (dates included) must repeat exactly
+    line = line.strip().lower()
+    return "#page#" if _PAGE_NUMBER.match(line) else line
+
+
+def strip_repeated_headers_footers(pages: List[str], edge_lines: int = 3, min_ratio: float = 0.5) -> List[str]:
+    """Drop lines that repeat at the top or bottom of at least half the pages (after page 1)."""
+    if len(pages) < 2:
+        return pages
+
+    page_lines = [[line for line in page.splitlines() if line.strip()] for page in pages]
+    counts: Counter = Counter()
+    for lines in page_lines:
+        counts.update({_line_key(line) for line in lines[:edge_lines] + lines[-edge_lines:]})
+
+    threshold = max(2, math.ceil(len(pages) * min_ratio))
+    repeated = {key for key, count in counts.items() if count >= threshold}
+    if not repeated:
+        return ["\n".join(lines) for lines in page_lines]
+
+    # The first page keeps its copy: running headers often carry the candidate's name
+    cleaned = ["\n".join(page_lines[0])]
+    for lines in page_lines[1:]:
+        n = len(lines)
+        cleaned.append("\n".join(
+            line for i, line in enumerate(lines)
+            if not ((i < edge_lines or i >= n - edge_lines) and _line_key(line) in repeated)
+        ))
+    return cleaned
+
+
+def collapse_whitespace(text: str) -> str:
+    text = re.sub(r"[ \t\u00a0\u2000-\u200b]+", " ", text)
+    lines = [line.strip() for line in text.split("\n")]
+    lines = [line for line in lines if not _BOILERPLATE.match(line)]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _heading_name(line: str) -> str:
+    if not line or len(line) > 50:
+        return ""
+    key = re.sub(r"[:\-–|•]+$", "", line.strip()).strip().lower().replace("&", "and")
+    return _HEADING_LOOKUP.get(re.sub(r"\s+", " ", key), "")
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split on recognised section headings; text before the first heading is 'header'."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.split("\n"):
+        name = _heading_name(line)
+        if name:
+            sections.append((name, []))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(body).strip()) for name, body in sections if "\n".join(body).strip()]
+
+
+def prepare_cv_text(cv_text: str) -> PreparedCV:
+    """Headers/footers -> whitespace/boilerplate -> sections. Pages are separated by PAGE_BREAK."""
+    pages = strip_repeated_headers_footers(cv_text.split(PAGE_BREAK))
+    text = collapse_whitespace("\n".join(pages))
+    sections = [(name, body) for name, body in split_sections(text) if name not in DROPPED_SECTIONS]
+
+    if len(sections) > 1:
+        text = "\n\n".join(body if name == "header" else f"{name.upper()}\n{body}" for name, body in sections)
+    return PreparedCV(text=text, sections=sections, original_chars=len(cv_text))
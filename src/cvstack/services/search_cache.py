@@ -0,0 +1,78 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..config import settings
+
+
+class SearchCache:
+    """
+    Small in-process TTL + LRU cache for search responses. Entries are only reused for
+    ttl seconds, so new CVs and catalog changes show up without explicit invalidation.
+    """
+
+    def __init__(self, ttl: float, max_items: int) -> None:
+        self.ttl = ttl
+        self.max_items = max_items
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0 or self.max_items <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "size": len(self._entries), "max_items": self.max_items, "ttl": self.ttl}
+
+
+_facet_cache: Optional[SearchCache] = None
+_facet_cache_lock = threading.Lock()
+
+
+def get_facet_cache() -> SearchCache:
+    """Process-wide cache of /search/facets responses, keyed by (query, filters)."""
+    global _facet_cache
+    with _facet_cache_lock:
+        if _facet_cache is None:
+            _facet_cache = SearchCache(settings.facet_cache_ttl, settings.facet_cache_size)
+        return _facet_cache
+
+
+_ranking_cache: Optional[SearchCache] = None
+_ranking_cache_lock = threading.Lock()
+
+
+def get_ranking_cache() -> SearchCache:
+    """Process-wide cache of ranked result lists, so pages 2..N don't re-run the ranking."""
+    global _ranking_cache
+    with _ranking_cache_lock:
+        if _ranking_cache is None:
+            _ranking_cache = SearchCache(settings.ranking_cache_ttl, settings.ranking_cache_size)
+        return _ranking_cache
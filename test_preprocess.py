@@ -0,0 +1,30 @@
+import sys
+sys.path.insert(0, 'src')
+
+from cvstack.services.preprocess import strip_repeated_headers_footers
+
+
+def test_running_header_and_page_numbers_are_stripped():
+    pages = [
+        "Jane Doe - Resume\nSUMMARY\nBackend engineer\nPage 1 of 2",
+        "Jane Doe - Resume\nEXPERIENCE\nAcme Corp\nPage 2 of 2",
+    ]
+    cleaned = strip_repeated_headers_footers(pages)
+    assert cleaned[0] == pages[0]
+    assert cleaned[1] == "EXPERIENCE\nAcme Corp"
+
+
+def test_date_ranges_at_page_edges_survive():
+    pages = [
+        "2019 - 2023\nSoftware Engineer, Acme\nBuilt APIs\nJan 2020 – Present",
+        "2015 - 2019\nBSc Computer Science\nUniversity of Colombo\nJan 2016 – Present",
+    ]
+    cleaned = strip_repeated_headers_footers(pages)
+    assert "2015 - 2019" in cleaned[1]
+    assert "Jan 2016 – Present" in cleaned[1]
+
+
+if __name__ == "__main__":
+    test_running_header_and_page_numbers_are_stripped()
+    test_date_ranges_at_page_edges_survive()
+    print("ok")